@@ -0,0 +1,114 @@
+"""로컬 목업 서버를 대상으로 Transport별 처리량을 측정합니다.
+
+    python benchmark.py [--requests 2000] [--threads 1 4 16]
+
+speedup은 같은 Transport의 첫 번째 스레드 수 대비 처리량 비율입니다. free-threaded(no-GIL) 빌드에서는 스레드 수에 비례해 늘어나야합니다.
+async Transport는 스레드 대신 BaseApi.arequest coroutine을 asyncio.gather로 스레드 수만큼 동시에 진행합니다.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from iamporter import Iamporter
+from iamporter.api import Payments
+
+BENCH_IMP_KEY = "bench_key"
+BENCH_IMP_SECRET = "bench_secret"
+BENCH_TRANSPORTS = ("requests", "urllib3", "async")
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, response):
+        body = json.dumps({'code': 0, 'message': None, 'response': response}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', "application/json")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._reply({'access_token': "bench_token"})
+
+    def do_GET(self):
+        imp_uid = self.path.rsplit("/", 1)[-1]
+        self._reply({'imp_uid': imp_uid, 'merchant_uid': "m_" + imp_uid, 'amount': 1000, 'cancel_amount': 0,
+                     'status': "paid"})
+
+
+def start_server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), BenchHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, "http://127.0.0.1:{port}/".format(port=httpd.server_address[1])
+
+
+def measure(client, total, threads):
+    """threads개의 스레드가 하나의 client를 공유하며 total건의 find_payment를 수행한 처리량(건/초)을 반환합니다."""
+    def work(i):
+        client.find_payment(imp_uid="imp_{i}".format(i=i))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, range(min(total, 50))))  # warm-up
+        started_at = time.perf_counter()
+        list(executor.map(work, range(total)))
+        return total / (time.perf_counter() - started_at)
+
+
+def measure_async(client, total, concurrency):
+    """concurrency건씩 동시에 진행하는 coroutine들로 total건의 결제 조회를 수행한 처리량(건/초)을 반환합니다."""
+    api_instance = Payments(client.imp_auth, imp_url=client.imp_url, transport=client.transport)
+
+    async def run(count):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def work(i):
+            async with semaphore:
+                await api_instance.arequest('GET', "/imp_{i}".format(i=i))
+        await asyncio.gather(*[work(i) for i in range(count)])
+
+    asyncio.run(run(min(total, 50)))  # warm-up
+    started_at = time.perf_counter()
+    asyncio.run(run(total))
+    return total / (time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--transports', nargs='+', default=list(BENCH_TRANSPORTS))
+    args = parser.parse_args()
+
+    httpd, url = start_server()
+    try:
+        gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+        print("python {version} (GIL {gil})".format(version=sys.version.split()[0],
+                                                    gil="enabled" if gil_enabled else "disabled"))
+        print("{:<10} {:>8} {:>12} {:>8}".format("transport", "threads", "req/s", "speedup"))
+        for transport in args.transports:
+            with Iamporter(imp_key=BENCH_IMP_KEY, imp_secret=BENCH_IMP_SECRET, imp_url=url,
+                           transport=transport) as client:
+                baseline = None
+                for threads in args.threads:
+                    throughput = (measure_async if transport == "async" else measure)(client, args.requests, threads)
+                    baseline = baseline or throughput
+                    print("{:<10} {:>8} {:>12.1f} {:>7.2f}x".format(transport, threads, throughput,
+                                                                    throughput / baseline))
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+
+GROUP_DAY = "day"
+GROUP_PG_PROVIDER = "pg_provider"
+GROUP_PAY_METHOD = "pay_method"
+GROUP_STATUS = "status"
+
+GROUP_KEYS = (GROUP_DAY, GROUP_PG_PROVIDER, GROUP_PAY_METHOD, GROUP_STATUS)
+
+KST = timezone(timedelta(hours=9))
+
+
+class PaymentAggregate:
+    """결제내역 그룹별 집계
+    결제건을 하나씩 받아 그룹별 건수, 결제금액 합계, 취소금액 합계만 누적하므로 결제건 수와 관계없이 그룹 수만큼의 메모리만 사용합니다.
+    누적값은 그룹 순서대로 array에 저장되며, 시간 구간을 나눠 따로 집계한 결과는 merge로 합칠 수 있습니다.
+
+    Attributes:
+        group_by (tuple): 그룹 기준 (day, pg_provider, pay_method, status)
+        tz (tzinfo): day 기준으로 날짜를 나눌 시간대. 기본값 KST
+    """
+
+    def __init__(self, group_by=(GROUP_DAY,), tz=KST):
+        """
+        Args:
+            group_by (tuple): 그룹 기준 (day, pg_provider, pay_method, status). 기본값 day
+            tz (tzinfo): day 기준으로 날짜를 나눌 시간대. 기본값 KST
+        """
+        unknown = [key for key in group_by if key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError("알 수 없는 그룹 기준입니다. ({keys})".format(keys=", ".join(unknown)))
+        self.group_by = tuple(group_by)
+        self.tz = tz
+
+        self._slots = {}
+        self._counts = array('q')
+        self._amounts = array('d')
+        self._cancel_amounts = array('d')
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _group(self, payment):
+        group = []
+        for key in self.group_by:
+            if key == GROUP_DAY:
+                timestamp = payment.get('paid_at') or payment.get('started_at') or 0
+                group.append(datetime.fromtimestamp(timestamp, self.tz).strftime('%Y-%m-%d'))
+            else:
+                group.append(payment.get(key))
+        return tuple(group)
+
+    def _slot(self, group):
+        slot = self._slots.get(group)
+        if slot is None:
+            slot = self._slots[group] = len(self._counts)
+            self._counts.append(0)
+            self._amounts.append(0)
+            self._cancel_amounts.append(0)
+        return slot
+
+    def add(self, payment):
+        """결제건 하나를 집계에 더합니다.
+
+        Args:
+            payment (dict): 결제 정보
+        """
+        slot = self._slot(self._group(payment))
+        self._counts[slot] += 1
+        self._amounts[slot] += payment.get('amount') or 0
+        self._cancel_amounts[slot] += payment.get('cancel_amount') or 0
+
+    def update(self, payments):
+        """결제건들을 순서대로 집계에 더합니다. 제너레이터를 넘기면 결제건을 하나씩 소비합니다.
+
+        Args:
+            payments (iterable): 결제 정보 dict들
+
+        Returns:
+            PaymentAggregate: 자기 자신
+        """
+        for payment in payments:
+            self.add(payment)
+        return self
+
+    def merge(self, other):
+        """다른 집계 결과를 합칩니다. 두 집계의 그룹 기준이 같아야합니다.
+
+        Args:
+            other (PaymentAggregate): 합칠 집계 결과
+
+        Returns:
+            PaymentAggregate: 자기 자신
+        """
+        if other.group_by != self.group_by:
+            raise ValueError("그룹 기준이 다른 집계는 합칠 수 없습니다.")
+        for group, other_slot in other._slots.items():
+            slot = self._slot(group)
+            self._counts[slot] += other._counts[other_slot]
+            self._amounts[slot] += other._amounts[other_slot]
+            self._cancel_amounts[slot] += other._cancel_amounts[other_slot]
+        return self
+
+    def get(self, *group):
+        """그룹의 집계값을 반환합니다.
+
+        Args:
+            *group: group_by 순서대로의 그룹 값
+
+        Returns:
+            dict: count, amount, cancel_amount. 집계된 결제건이 없으면 None
+        """
+        slot = self._slots.get(tuple(group))
+        if slot is None:
+            return None
+        return {
+            'count': self._counts[slot],
+            'amount': self._amounts[slot],
+            'cancel_amount': self._cancel_amounts[slot],
+        }
+
+    def rows(self):
+        """그룹 값 순서로 정렬된 집계 결과를 반환합니다.
+
+        Returns:
+            list: group_by의 각 기준과 count, amount, cancel_amount를 키로 갖는 dict들
+        """
+        rows = []
+        for group in sorted(self._slots, key=lambda group: tuple('' if value is None else str(value)
+                                                                  for value in group)):
+            row = dict(zip(self.group_by, group))
+            row.update(self.get(*group))
+            rows.append(row)
+        return rows
+
+
+def split_windows(search_from, search_to, window):
+    """[search_from, search_to] 구간을 window초 단위의 겹치지 않는 구간들로 나눕니다.
+
+    Args:
+        search_from (int): 시작 시각(>=) UNIX TIMESTAMP
+        search_to (int): 종료 시각(<=) UNIX TIMESTAMP
+        window (int): 구간 길이(초). 0보다 커야합니다.
+
+    Returns:
+        list: (search_from, search_to) 목록
+    """
+    if window <= 0:
+        raise ValueError("구간 길이는 0보다 커야합니다. ({window})".format(window=window))
+    windows = []
+    start = search_from
+    while start <= search_to:
+        end = min(start + window - 1, search_to)
+        windows.append((start, end))
+        start = end + 1
+    return windows
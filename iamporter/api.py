@@ -8,14 +8,88 @@ class Certifications(BaseApi):
 class Cards(BaseApi):
     NAMESPACE = "cards"
 
+    def get_list(self):
+        """카드사 목록 조회
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('')
+
+    def get(self, card_code):
+        """카드사 코드로 카드사명 조회
+
+        Args:
+            card_code (str): 카드사 코드
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('/{card_code}'.format(card_code=card_code))
+
 
 class Banks(BaseApi):
     NAMESPACE = "banks"
 
+    def get_list(self):
+        """은행 목록 조회
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('')
+
+    def get(self, bank_code):
+        """은행 코드로 은행명 조회
+
+        Args:
+            bank_code (str): 은행 표준코드
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('/{bank_code}'.format(bank_code=bank_code))
+
 
 class Escrows(BaseApi):
     NAMESPACE = "escrows"
 
+    def _logis_body(self, sender, receiver, logis):
+        return self._build_params(**{
+            'sender': sender and self._build_params(**sender),
+            'receiver': receiver and self._build_params(**receiver),
+            'logis': logis and self._build_params(**logis),
+        })
+
+    def post_logis(self, imp_uid, sender=None, receiver=None, logis=None):
+        """에스크로 결제건의 배송정보 등록
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            sender (dict): 발신자 정보 (name, tel, addr, postcode)
+            receiver (dict): 수신자 정보 (name, tel, addr, postcode)
+            logis (dict): 배송 정보 (company: 택배사 코드, invoice: 송장번호, sent_at: 발송일시 UNIX TIMESTAMP,
+                receive_at: 수령일 YYYYMMDD, address: 배송지 주소)
+
+        Returns:
+            IamportResponse
+        """
+        return self._post_json('/logis/{imp_uid}'.format(imp_uid=imp_uid), self._logis_body(sender, receiver, logis))
+
+    def put_logis(self, imp_uid, sender=None, receiver=None, logis=None):
+        """에스크로 결제건의 배송정보 수정
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            sender (dict): 발신자 정보 (name, tel, addr, postcode)
+            receiver (dict): 수신자 정보 (name, tel, addr, postcode)
+            logis (dict): 배송 정보 (post_logis 참조)
+
+        Returns:
+            IamportResponse
+        """
+        return self._put_json('/logis/{imp_uid}'.format(imp_uid=imp_uid), self._logis_body(sender, receiver, logis))
+
 
 class Naver(BaseApi):
     NAMESPACE = "naver"
@@ -28,6 +102,17 @@ class Payco(BaseApi):
 class Payments(BaseApi):
     NAMESPACE = "payments"
 
+    def get_list(self, imp_uids):
+        """여러 개의 아임포트 고유번호로 결제내역을 한 번에 조회합니다
+
+        Args:
+            imp_uids (list): 아임포트 고유번호 목록 (최대 100개)
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('', **{'imp_uid[]': list(imp_uids)})
+
     def get_balance(self, imp_uid):
         """결제수단별 금액 상세 정보 확인
         아임포트 고유번호로 결제수단별 금액 상세정보를 확인합니다.(현재, PAYCO결제수단에 한해 제공되고 있습니다.)
@@ -145,6 +230,58 @@ class Payments(BaseApi):
 class Receipts(BaseApi):
     NAMESPACE = "receipts"
 
+    def get(self, imp_uid):
+        """현금영수증 발급내역 조회
+        아임포트 고유번호로 발급된 현금영수증 내역을 조회합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+
+        Returns:
+            IamportResponse
+        """
+        return self._get('/{imp_uid}'.format(imp_uid=imp_uid))
+
+    def post(self, imp_uid, identifier, identifier_type=None, type=None, buyer_name=None, buyer_email=None,
+             buyer_tel=None, tax_free=None):
+        """현금영수증 발급
+        아임포트 고유번호에 해당하는 결제건에 대해 현금영수증을 발급합니다.
+
+        Args:
+            imp_uid (str): 현금영수증을 발급할 결제건의 아임포트 고유번호
+            identifier (str): 현금영수증 발행대상 식별정보 (국세청현금영수증카드, 휴대폰번호, 주민등록번호, 사업자등록번호)
+            identifier_type (str): 현금영수증 발행대상 식별정보 유형 (person, business, phone, taxcard)
+            type (str): 현금영수증 발행 유형 (person: 소득공제용, company: 지출증빙용). 기본값 person
+            buyer_name (str): 구매자 이름
+            buyer_email (str): 구매자 Email
+            buyer_tel (str): 구매자 전화번호
+            tax_free (float): 현금영수증 발행금액 중 면세금액
+
+        Returns:
+            IamportResponse
+        """
+        params = self._build_params(**{
+            'identifier': identifier,
+            'identifier_type': identifier_type,
+            'type': type,
+            'buyer_name': buyer_name,
+            'buyer_email': buyer_email,
+            'buyer_tel': buyer_tel,
+            'tax_free': tax_free,
+        })
+        return self._post('/{imp_uid}'.format(imp_uid=imp_uid), **params)
+
+    def delete(self, imp_uid):
+        """현금영수증 발급취소
+
+        Args:
+            imp_uid (str): 현금영수증 발급을 취소할 결제건의 아임포트 고유번호
+
+        Returns:
+            IamportResponse
+        """
+        return self._delete('/{imp_uid}'.format(imp_uid=imp_uid))
+
 
 class Subscribe(BaseApi):
     NAMESPACE = "subscribe"
@@ -314,3 +451,87 @@ class Subscribe(BaseApi):
 
 class VBanks(BaseApi):
     NAMESPACE = "vbanks"
+
+    def post(self, merchant_uid, amount, vbank_code, vbank_due, vbank_holder, name=None, pg=None,
+             buyer_name=None, buyer_email=None, buyer_tel=None, buyer_addr=None, buyer_postcode=None,
+             notice_url=None, custom_data=None):
+        """가상계좌 발급
+        PG사의 가상계좌 발급 API를 통해 결제창 없이 가상계좌를 발급합니다. 발급된 결제건의 status는 ready입니다.
+
+        Args:
+            merchant_uid (str): 가맹점 거래 고유번호
+            amount (float): 결제금액
+            vbank_code (str): 은행구분코드
+            vbank_due (int): 가상계좌 입금기한 UNIX TIMESTAMP
+            vbank_holder (str): 가상계좌 예금주명
+            name (str): 주문명
+            pg (str): 가상계좌 발급 API를 지원하는 PG설정이 2개 이상인 경우, 발급이 진행되길 원하는 PG사를 지정하실 수 있습니다.
+            buyer_name (str): 주문자명
+            buyer_email (str): 주문자 E-mail주소
+            buyer_tel (str): 주문자 전화번호
+            buyer_addr (str): 주문자 주소
+            buyer_postcode (str): 주문자 우편번호
+            notice_url (str): 입금 통보를 받을 URL. 누락 시 아임포트 관리자 페이지에 설정된 URL을 사용합니다.
+            custom_data (str): 거래정보와 함께 저장할 추가 정보
+
+        Returns:
+            IamportResponse
+        """
+        params = self._build_params(**{
+            'merchant_uid': merchant_uid,
+            'amount': amount,
+            'vbank_code': vbank_code,
+            'vbank_due': vbank_due,
+            'vbank_holder': vbank_holder,
+            'name': name,
+            'pg': pg,
+            'buyer_name': buyer_name,
+            'buyer_email': buyer_email,
+            'buyer_tel': buyer_tel,
+            'buyer_addr': buyer_addr,
+            'buyer_postcode': buyer_postcode,
+            'notice_url': notice_url,
+            'custom_data': custom_data,
+        })
+        return self._post('', **params)
+
+    def put(self, imp_uid, amount=None, vbank_due=None):
+        """가상계좌 정보 변경
+        발급된 가상계좌의 입금기한 또는 입금금액을 변경합니다.
+
+        Args:
+            imp_uid (str): 변경할 가상계좌 결제건의 아임포트 고유번호
+            amount (float): 변경할 입금금액
+            vbank_due (int): 변경할 입금기한 UNIX TIMESTAMP
+
+        Returns:
+            IamportResponse
+        """
+        params = self._build_params(amount=amount, vbank_due=vbank_due)
+        return self._put('/{imp_uid}'.format(imp_uid=imp_uid), **params)
+
+    def delete(self, imp_uid):
+        """가상계좌 발급취소
+        입금이 이루어지지 않은 가상계좌를 말소합니다.
+
+        Args:
+            imp_uid (str): 발급취소할 가상계좌 결제건의 아임포트 고유번호
+
+        Returns:
+            IamportResponse
+        """
+        return self._delete('/{imp_uid}'.format(imp_uid=imp_uid))
+
+    def get_holder(self, bank_code, bank_num):
+        """예금주 조회
+        은행코드와 계좌번호로 예금주를 조회합니다.
+
+        Args:
+            bank_code (str): 은행구분코드
+            bank_num (str): 계좌번호 (숫자외 기호 포함 가능)
+
+        Returns:
+            IamportResponse
+        """
+        params = self._build_params(bank_code=bank_code, bank_num=bank_num)
+        return self._get('/holder', **params)
@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import threading
+import time
+
+from .consts import IMP_STATUS_CANCELED, IMP_STATUS_PAID
+
+DEFAULT_REFUND_WINDOW = 365 * 24 * 60 * 60
+
+
+class PaymentArchive:
+    """더 이상 변하지 않는 결제건을 보관하는 SQLite 저장소
+    전액 취소(cancelled)되었거나, 결제완료(paid) 후 환불 가능 기간이 지난 결제건만 보관합니다.
+    Iamporter의 archive 인자로 넘기면 조회 결과가 자동으로 보관되고, 보관된 결제건은 API를 호출하지 않고 반환합니다.
+
+    Attributes:
+        path (str): SQLite 데이터베이스 파일 경로. ":memory:"이면 메모리에만 보관합니다.
+        refund_window (int): 결제완료 후 환불이 가능한 기간(초)
+    """
+
+    def __init__(self, path, refund_window=DEFAULT_REFUND_WINDOW, clock=time.time):
+        """
+        Args:
+            path (str): SQLite 데이터베이스 파일 경로
+            refund_window (int): 결제완료 후 환불이 가능한 기간(초). 기본값 365일
+            clock (callable): 현재 UNIX TIMESTAMP를 반환하는 함수
+        """
+        self.path = path
+        self.refund_window = refund_window
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS payments (
+                imp_uid TEXT PRIMARY KEY,
+                merchant_uid TEXT,
+                status TEXT,
+                started_at INTEGER,
+                data TEXT
+            );
+            CREATE INDEX IF NOT EXISTS payments_merchant_uid ON payments (merchant_uid);
+            CREATE INDEX IF NOT EXISTS payments_status_started_at ON payments (status, started_at);
+        ''')
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM payments").fetchone()[0]
+
+    def __contains__(self, imp_uid):
+        return self.get(imp_uid) is not None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def is_settled(self, payment):
+        """결제건이 더 이상 변하지 않는 상태인지 확인합니다.
+
+        Args:
+            payment (dict): 결제 정보
+
+        Returns:
+            bool
+        """
+        status = payment.get('status')
+        if status == IMP_STATUS_CANCELED:
+            return True
+        if status == IMP_STATUS_PAID:
+            paid_at = payment.get('paid_at') or 0
+            return 0 < paid_at < self.clock() - self.refund_window
+        return False
+
+    def store(self, payments):
+        """결제건들 중 더 이상 변하지 않는 건만 골라 보관합니다.
+
+        Args:
+            payments (list): 결제 정보 dict 목록
+
+        Returns:
+            int: 보관된 결제건수
+        """
+        rows = [(payment['imp_uid'], payment.get('merchant_uid'), payment.get('status'),
+                 payment.get('started_at'), json.dumps(payment, ensure_ascii=False, separators=(',', ':')))
+                for payment in payments if payment.get('imp_uid') and self.is_settled(payment)]
+        if rows:
+            with self._lock, self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO payments VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get(self, imp_uid):
+        """아임포트 고유번호로 보관된 결제건을 조회합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+
+        Returns:
+            dict: 보관된 결제건이 없으면 None
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM payments WHERE imp_uid = ?", (imp_uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, merchant_uid):
+        """가맹점지정 고유번호로 보관된 결제건들을 최신순으로 조회합니다.
+
+        Args:
+            merchant_uid (str): 가맹점지정 고유번호
+
+        Returns:
+            list
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM payments WHERE merchant_uid = ? ORDER BY started_at DESC", (merchant_uid,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def query(self, payment_status=None, search_from=None, search_to=None):
+        """보관된 결제건들을 결제요청 시각(started_at) 순으로 조회합니다.
+
+        Args:
+            payment_status (str): 특정 status의 결제건만 조회하는 경우 지정
+            search_from (int): 결제요청 시각 검색 시작 UNIX TIMESTAMP (>=)
+            search_to (int): 결제요청 시각 검색 종료 UNIX TIMESTAMP (<=)
+
+        Yields:
+            dict
+        """
+        conditions, args = [], []
+        if payment_status:
+            conditions.append("status = ?")
+            args.append(payment_status)
+        if search_from is not None:
+            conditions.append("started_at >= ?")
+            args.append(search_from)
+        if search_to is not None:
+            conditions.append("started_at <= ?")
+            args.append(search_to)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        with self._lock:
+            cursor = self._connection.execute("SELECT data FROM payments" + where + " ORDER BY started_at", args)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row[0])
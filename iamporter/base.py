@@ -1,10 +1,13 @@
+import asyncio
+import json
+import threading
 import urllib.parse
 
-import requests
 from requests.auth import AuthBase
 
 from .consts import IAMPORT_API_URL
 from .errors import ImpUnAuthorized
+from .transports import RequestsTransport
 
 
 def build_url(base_url: str, path: str = "/"):
@@ -55,37 +58,53 @@ class IamportResponse:
 
 class IamportAuth(AuthBase):
     """아임포트 인증 객체
+    token은 재발급할 때 새 값으로 통째로 교체되므로, 여러 스레드가 잠금 없이 읽어도 항상 완전한 토큰을 얻습니다.
+    재발급은 한 번에 하나의 스레드만 진행합니다.
 
     Attributes:
         token (str): 발급받은 액세스 토큰
     """
 
-    def __init__(self, imp_key, imp_secret, session=None, imp_url=IAMPORT_API_URL):
+    def __init__(self, imp_key, imp_secret, session=None, imp_url=IAMPORT_API_URL, transport=None):
         """
         Args:
             imp_key (str): 아임포트 API 키
             imp_secret (str): 아임포트 API 시크릿
-            session (requests.Session): API 요청에 사용할 requests Session 인스턴스
+            session (requests.Session): 토큰 발급 요청에 사용할 requests Session 인스턴스. 닫지 않으므로 재발급에도 계속 사용되며, 닫는 것은 호출한 쪽의 몫입니다.
             imp_url (str): 아임포트 API URL
+            transport (BaseTransport): 토큰 발급 요청에 사용할 Transport. 지정하면 session은 무시됩니다.
         """
 
         self.token = None
 
-        api_endpoint = build_url(imp_url, '/users/getToken')
-        api_payload = {'imp_key': imp_key, 'imp_secret': imp_secret}
-
-        auth_response = IamportResponse(
-            session.post(api_endpoint, data=api_payload) if isinstance(session, requests.Session)
-            else requests.post(api_endpoint, data=api_payload)
-        )
-        if auth_response.is_succeed:
-            self.token = auth_response.data.get('access_token', None)
+        self._api_endpoint = build_url(imp_url, '/users/getToken')
+        self._api_payload = {'imp_key': imp_key, 'imp_secret': imp_secret}
+        self._lock = threading.Lock()
 
-        if session:
-            session.close()
+        self._transport = transport or RequestsTransport(session)
+        self.token = self._issue()
 
-        if self.token is None:
+    def _issue(self):
+        auth_response = IamportResponse(self._transport.request('POST', self._api_endpoint, data=self._api_payload))
+        token = auth_response.data.get('access_token', None) if auth_response.is_succeed else None
+        if token is None:
             raise ImpUnAuthorized(auth_response.message)
+        return token
+
+    def refresh(self, stale_token=None):
+        """액세스 토큰을 재발급합니다.
+        여러 스레드가 같은 만료 토큰으로 동시에 호출해도 재발급 요청은 한 번만 보냅니다.
+
+        Args:
+            stale_token (str): 만료된 것으로 확인된 토큰. 그 사이 다른 스레드가 이미 재발급했다면 요청 없이 새 토큰을 반환합니다.
+
+        Returns:
+            str: 새 액세스 토큰
+        """
+        with self._lock:
+            if stale_token is None or self.token == stale_token:
+                self.token = self._issue()
+            return self.token
 
     def __call__(self, r):
         r.headers['Authorization'] = self.token
@@ -97,19 +116,25 @@ class BaseApi:
 
     Attributes:
         requests_session (requests.Session): API 호출에 사용될 requests Session 인스턴스
+        transport (BaseTransport): API 호출에 사용될 Transport
+        hedging (HedgePolicy): GET 요청에 적용할 헤징 정책
     """
     NAMESPACE = ""
 
-    def __init__(self, auth, session=None, imp_url=IAMPORT_API_URL):
+    def __init__(self, auth, session=None, imp_url=IAMPORT_API_URL, transport=None, hedging=None):
         """
         Args:
             auth (IamportAuth): 아임포트 API 인증 인스턴스
             session (requests.Session): API 요청에 사용할 requests Session 인스턴스
             imp_url (str): 아임포트 API URL
+            transport (BaseTransport): API 요청에 사용할 Transport. 누락 시 session을 사용하는 RequestsTransport를 만듭니다.
+            hedging (HedgePolicy): GET 요청에 적용할 헤징 정책. 누락 시 헤징하지 않습니다.
         """
         self.iamport_auth = auth
         self.requests_session = session
         self.imp_url = imp_url
+        self.transport = transport or RequestsTransport(session)
+        self.hedging = hedging
 
     def _build_url(self, endpoint):
         return build_url(self.imp_url, self.NAMESPACE + endpoint)
@@ -129,6 +154,66 @@ class BaseApi:
                 params[key] = value
         return params
 
+    def _build_headers(self):
+        if self.iamport_auth is None:
+            return {}
+        return {'Authorization': self.iamport_auth.token}
+
+    def _build_body(self, data, json_body):
+        headers = self._build_headers()
+        if json_body is not None:
+            data = json.dumps(json_body, ensure_ascii=False).encode('utf-8')
+            headers['Content-Type'] = "application/json"
+        return data, headers
+
+    def _request(self, method, endpoint, params=None, data=None, json_body=None):
+        """Transport로 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
+
+        Args:
+            method (str): HTTP Method
+            endpoint (str): API Endpoint
+            params (dict): 쿼리 파라메터
+            data (dict): form 본문
+            json_body (dict): JSON 본문. 지정하면 data 대신 JSON으로 인코딩해 보냅니다.
+
+        Returns:
+            IamportResponse
+        """
+        data, headers = self._build_body(data, json_body)
+        response = IamportResponse(self.transport.request(method, self._build_url(endpoint), params=params, data=data,
+                                                          headers=headers))
+        if response.status == 401 and self.iamport_auth is not None:  # 만료된 토큰은 재발급 후 한 번만 다시 요청합니다.
+            self.iamport_auth.refresh(headers['Authorization'])
+            headers.update(self._build_headers())
+            response = IamportResponse(self.transport.request(method, self._build_url(endpoint), params=params,
+                                                              data=data, headers=headers))
+        return response
+
+    async def arequest(self, method, endpoint, params=None, data=None, json_body=None):
+        """API 요청을 보내는 coroutine. arequest를 지원하는 Transport(AsyncTransport)가 필요합니다.
+        이벤트 루프를 막지 않으므로 asyncio.gather로 여러 요청을 동시에 보낼 수 있습니다.
+
+        Args:
+            method (str): HTTP Method
+            endpoint (str): API Endpoint
+            params (dict): 쿼리 파라메터
+            data (dict): form 본문
+            json_body (dict): JSON 본문. 지정하면 data 대신 JSON으로 인코딩해 보냅니다.
+
+        Returns:
+            IamportResponse
+        """
+        data, headers = self._build_body(data, json_body)
+        response = IamportResponse(await self.transport.arequest(method, self._build_url(endpoint), params=params,
+                                                                 data=data, headers=headers))
+        if response.status == 401 and self.iamport_auth is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.iamport_auth.refresh, headers['Authorization'])
+            headers.update(self._build_headers())
+            response = IamportResponse(await self.transport.arequest(method, self._build_url(endpoint), params=params,
+                                                                     data=data, headers=headers))
+        return response
+
     def _get(self, endpoint, **kwargs):
         """GET 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
 
@@ -139,11 +224,9 @@ class BaseApi:
         Returns:
             IamportResponse
         """
-        if isinstance(self.requests_session, requests.Session):
-            return IamportResponse(
-                self.requests_session.get(self._build_url(endpoint), auth=self.iamport_auth, params=kwargs))
-
-        return IamportResponse(requests.get(self._build_url(endpoint), auth=self.iamport_auth, params=kwargs))
+        if self.hedging is not None:  # GET 요청은 멱등하므로 같은 요청을 한 번 더 보내도 안전합니다.
+            return self.hedging.execute(lambda: self._request('GET', endpoint, params=kwargs))
+        return self._request('GET', endpoint, params=kwargs)
 
     def _post(self, endpoint, **kwargs):
         """POST 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
@@ -155,11 +238,43 @@ class BaseApi:
         Returns:
             IamportResponse
         """
-        if isinstance(self.requests_session, requests.Session):
-            return IamportResponse(
-                self.requests_session.post(self._build_url(endpoint), auth=self.iamport_auth, data=kwargs))
+        return self._request('POST', endpoint, data=kwargs)
 
-        return IamportResponse(requests.post(self._build_url(endpoint), auth=self.iamport_auth, data=kwargs))
+    def _post_json(self, endpoint, body):
+        """JSON 본문으로 POST 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
+
+        Args:
+            endpoint (str): API Endpoint
+            body (dict): JSON 본문
+
+        Returns:
+            IamportResponse
+        """
+        return self._request('POST', endpoint, json_body=body)
+
+    def _put_json(self, endpoint, body):
+        """JSON 본문으로 PUT 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
+
+        Args:
+            endpoint (str): API Endpoint
+            body (dict): JSON 본문
+
+        Returns:
+            IamportResponse
+        """
+        return self._request('PUT', endpoint, json_body=body)
+
+    def _put(self, endpoint, **kwargs):
+        """PUT 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
+
+        Args:
+            endpoint (str): API Endpoint
+            **kwargs
+
+        Returns:
+            IamportResponse
+        """
+        return self._request('PUT', endpoint, data=kwargs)
 
     def _delete(self, endpoint):
         """DELETE 요청을 보내고 그 결과를 IamportResponse 객체로 리턴합니다.
@@ -170,8 +285,4 @@ class BaseApi:
         Returns:
             IamportResponse
         """
-        if isinstance(self.requests_session, requests.Session):
-            return IamportResponse(
-                self.requests_session.delete(self._build_url(endpoint), auth=self.iamport_auth))
-
-        return IamportResponse(requests.delete(self._build_url(endpoint), auth=self.iamport_auth))
+        return self._request('DELETE', endpoint)
@@ -0,0 +1,271 @@
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .errors import ImpApiError
+from .transports import TRANSPORT_ERRORS
+
+
+def read_csv(path, encoding='utf-8'):
+    """CSV 파일을 한 줄씩 읽어 dict로 반환합니다. 빈 값은 None으로 바꿉니다.
+    파일 전체를 메모리에 올리지 않으므로 BulkRunner의 입력으로 바로 넘길 수 있습니다.
+
+    Args:
+        path (str): CSV 파일 경로. 첫 줄은 헤더여야합니다.
+        encoding (str): 파일 인코딩. 기본값 utf-8
+
+    Yields:
+        dict
+    """
+    with open(path, newline='', encoding=encoding) as f:
+        for row in csv.DictReader(f):
+            yield {key: value or None for key, value in row.items()}
+
+
+class RateLimiter:
+    """초당 요청 수를 제한하는 토큰 버킷
+
+    Attributes:
+        rate (float): 초당 허용 요청 수
+        burst (int): 한 번에 몰아서 허용할 수 있는 최대 요청 수
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate (float): 초당 허용 요청 수
+            burst (int): 한 번에 몰아서 허용할 수 있는 최대 요청 수. 기본값 1
+        """
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """요청 토큰을 하나 얻을 때까지 대기합니다."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class BulkResult:
+    """대량 작업의 항목별 처리 결과
+
+    Attributes:
+        key (str): 항목 식별자
+        data (dict): 처리에 성공한 경우의 API 응답 데이터
+        error (Exception): 처리에 실패한 경우 발생한 예외
+    """
+
+    def __init__(self, key, data=None, error=None):
+        self.key = key
+        self.data = data
+        self.error = error
+
+    @property
+    def is_succeed(self):
+        """항목 처리가 성공했는지 확인"""
+        return self.error is None
+
+    def __repr__(self):
+        return "<BulkResult key={key} succeed={succeed}>".format(key=self.key, succeed=self.is_succeed)
+
+
+def is_retryable(error):
+    """다시 시도하면 성공할 수 있는 오류인지 확인합니다. 전송 계층 오류와 429, 5xx 응답이 해당됩니다.
+
+    Args:
+        error (Exception)
+
+    Returns:
+        bool
+    """
+    if isinstance(error, ImpApiError):
+        return error.response.status == 429 or error.response.status >= 500
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+class BulkReport:
+    """대량 작업 결과 요약
+
+    Attributes:
+        succeeded (list): 성공한 항목의 식별자
+        failed (dict): 실패한 항목의 식별자 → 예외
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = {}
+
+    @classmethod
+    def collect(cls, results):
+        """결과들을 모두 읽어 요약합니다.
+
+        Args:
+            results (iterable): BulkResult들
+
+        Returns:
+            BulkReport
+        """
+        report = cls()
+        for result in results:
+            report.add(result)
+        return report
+
+    def add(self, result):
+        """
+        Args:
+            result (BulkResult)
+        """
+        if result.is_succeed:
+            self.succeeded.append(result.key)
+        else:
+            self.failed[result.key] = result.error
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def retryable(self):
+        """다시 실행하면 성공할 수 있는 실패 항목의 식별자"""
+        return [key for key, error in self.failed.items() if is_retryable(error)]
+
+    def __str__(self):
+        return "전체 {total}건 / 성공 {succeeded}건 / 실패 {failed}건 (재시도 가능 {retryable}건)".format(
+            total=self.total, succeeded=len(self.succeeded), failed=len(self.failed), retryable=len(self.retryable))
+
+
+class Checkpoint:
+    """대량 작업의 진행상황 기록 객체
+    처리가 끝난 항목을 JSON Lines 파일에 한 줄씩 기록하고, 같은 파일로 다시 실행하면 이미 성공한 항목은 건너뜁니다.
+
+    Attributes:
+        path (str): 체크포인트 파일 경로
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): 체크포인트 파일 경로. 파일이 없으면 새로 만듭니다.
+        """
+        self.path = path
+        self._done = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:  # 비정상 종료로 잘린 마지막 줄
+                        continue
+                    if record.get('succeed'):
+                        self._done.add(record['key'])
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __contains__(self, key):
+        return key in self._done
+
+    def record(self, result):
+        """항목 처리 결과를 기록합니다.
+
+        Args:
+            result (BulkResult)
+        """
+        line = json.dumps({'key': result.key, 'succeed': result.is_succeed}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if result.is_succeed:
+                self._done.add(result.key)
+
+    def close(self):
+        self._file.close()
+
+
+class BulkRunner:
+    """대량 API 호출 실행 객체
+    동시 실행 수와 초당 요청 수를 제한하면서 항목마다 func를 호출하고, 처리가 끝나는 순서대로 BulkResult를 돌려줍니다.
+    입력은 필요한 만큼만 읽기 때문에 iterable이 아무리 커도 메모리 사용량은 동시 실행 수에 비례합니다.
+
+    Attributes:
+        func (callable): 항목 하나를 처리하는 함수. 반환값이 BulkResult.data가 됩니다.
+        key (callable): 항목에서 식별자(str)를 뽑아내는 함수
+        max_workers (int): 최대 동시 실행 수
+        rate_limiter (RateLimiter): 초당 요청 수 제한. None이면 제한하지 않습니다.
+        checkpoint (str or Checkpoint): 진행상황을 기록할 체크포인트
+    """
+
+    def __init__(self, func, key=str, max_workers=4, rate=None, checkpoint=None):
+        """
+        Args:
+            func (callable): 항목 하나를 처리하는 함수
+            key (callable): 항목에서 식별자(str)를 뽑아내는 함수. 기본값 str
+            max_workers (int): 최대 동시 실행 수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            checkpoint (str or Checkpoint): 체크포인트 파일 경로 또는 Checkpoint 인스턴스
+        """
+        self.func = func
+        self.key = key
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate, burst=max_workers) if rate else None
+        self.checkpoint = checkpoint
+
+    def _call(self, key, item):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        try:
+            return BulkResult(key, data=self.func(item))
+        except Exception as e:
+            return BulkResult(key, error=e)
+
+    def run(self, items):
+        """항목들을 처리하고 처리가 끝나는 순서대로 결과를 반환합니다.
+
+        Args:
+            items (iterable): 처리할 항목들
+
+        Yields:
+            BulkResult
+        """
+        checkpoint = Checkpoint(self.checkpoint) if isinstance(self.checkpoint, str) else self.checkpoint
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = set()
+                for item in items:
+                    key = self.key(item)
+                    if checkpoint is not None and key in checkpoint:
+                        continue
+                    if len(pending) >= self.max_workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield self._finish(future, checkpoint)
+                    pending.add(executor.submit(self._call, key, item))
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._finish(future, checkpoint)
+        finally:
+            if checkpoint is not None and checkpoint is not self.checkpoint:
+                checkpoint.close()
+
+    @staticmethod
+    def _finish(future, checkpoint):
+        result = future.result()
+        if checkpoint is not None:
+            checkpoint.record(result)
+        return result
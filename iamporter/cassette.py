@@ -0,0 +1,181 @@
+import gzip
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+import requests
+
+from .errors import ImpCassetteMiss
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+RECORDED_LATENCY = "recorded"
+
+FILTERED = "[FILTERED]"
+
+# 카세트에 원문이 남지 않도록 가려지는 요청/응답 필드
+SCRUB_FIELDS = frozenset([
+    'imp_key', 'imp_secret', 'access_token',
+    'card_number', 'expiry', 'birth', 'pwd_2digit',
+    'identifier', 'refund_account',
+])
+
+
+def scrub(value, fields=SCRUB_FIELDS):
+    """dict/list 안에서 민감한 필드의 값을 FILTERED로 바꾼 사본을 반환합니다.
+
+    Args:
+        value: JSON 호환 값
+        fields (frozenset): 가릴 필드 이름
+
+    Returns:
+        JSON 호환 값
+    """
+    if isinstance(value, dict):
+        return {key: FILTERED if key in fields and item is not None else scrub(item, fields)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [scrub(item, fields) for item in value]
+    return value
+
+
+class Cassette(requests.Session):
+    """HTTP 요청 녹화/재생 세션
+    record 모드에서는 실제 요청/응답을 민감정보를 가린 채 기록하고, replay 모드에서는 네트워크 없이 기록된 응답을 돌려줍니다.
+    requests.Session을 상속하므로 Iamporter, IamportAuth, BaseApi의 session 인자로 그대로 넘길 수 있습니다.
+
+    요청은 method, 경로, 쿼리, 본문으로 구분되며 같은 요청이 여러 번 녹화된 경우 녹화된 순서대로 재생하고,
+    모두 재생한 뒤에는 마지막 응답을 반복합니다. 호스트는 구분하지 않으므로 목업 서버에서 녹화한 카세트도 재생할 수 있습니다.
+
+    Attributes:
+        path (str): 카세트 파일 경로. .gz로 끝나면 gzip으로 압축합니다.
+        mode (str): record 또는 replay
+        latency (float or str): 재생 시 응답마다 지연시킬 시간(초). "recorded"이면 녹화 당시의 응답시간을 재현합니다.
+    """
+
+    def __init__(self, path, mode=MODE_REPLAY, latency=0, scrub_fields=SCRUB_FIELDS):
+        """
+        Args:
+            path (str): 카세트 파일 경로
+            mode (str): record 또는 replay. 기본값 replay
+            latency (float or str): 재생 시 응답 지연시간(초) 또는 "recorded". 기본값 0
+            scrub_fields (frozenset): 가릴 필드 이름. 기본값 SCRUB_FIELDS
+        """
+        super().__init__()
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError("mode는 record 또는 replay 중 하나여야합니다.")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.scrub_fields = scrub_fields
+
+        self._lock = threading.Lock()
+        self._interactions = []
+        self._queues = {}
+        self._last = {}
+
+        if mode == MODE_REPLAY:
+            self._load()
+
+    def _open(self, mode):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, mode + 't', encoding='utf-8')
+        return open(self.path, mode, encoding='utf-8')
+
+    def _load(self):
+        with self._open('r') as f:
+            self._interactions = json.load(f)['interactions']
+        for interaction in self._interactions:
+            key = self._key(interaction['request'])
+            self._queues.setdefault(key, deque()).append(interaction)
+
+    def save(self):
+        """녹화된 요청/응답을 카세트 파일에 저장합니다."""
+        if self.mode != MODE_RECORD:
+            return
+        with self._lock:
+            interactions = list(self._interactions)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._open('w') as f:
+            json.dump({'version': 1, 'interactions': interactions}, f,
+                      ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+    def close(self):
+        self.save()
+        super().close()
+
+    def _describe(self, prepared):
+        url = urllib.parse.urlsplit(prepared.url)
+        query = sorted(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        body = prepared.body or ""
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        if prepared.headers.get('Content-Type', '').startswith("application/json"):
+            form = json.loads(body)
+        else:
+            form = dict(urllib.parse.parse_qsl(body, keep_blank_values=True))
+        return {
+            'method': prepared.method,
+            'path': url.path,
+            'query': [list(pair) for pair in query],
+            'body': scrub(form, self.scrub_fields),
+        }
+
+    @staticmethod
+    def _key(request):
+        return json.dumps([request['method'], request['path'], request['query'], request['body']], sort_keys=True)
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        prepared = requests.Request(method.upper(), url, params=params, data=data,
+                                    headers=kwargs.get('headers')).prepare()
+        described = self._describe(prepared)
+
+        if self.mode == MODE_RECORD:
+            started_at = time.monotonic()
+            response = super().request(method, url, params=params, data=data, **kwargs)
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            interaction = {
+                'request': described,
+                'response': {'status': response.status_code, 'body': scrub(body, self.scrub_fields)},
+                'elapsed': round(time.monotonic() - started_at, 4),
+            }
+            with self._lock:
+                self._interactions.append(interaction)
+            return response
+
+        interaction = self._next(described, prepared)
+        latency = interaction.get('elapsed', 0) if self.latency == RECORDED_LATENCY else self.latency
+        if latency:
+            time.sleep(latency)
+        return self._build_response(interaction['response'], prepared)
+
+    def _next(self, described, prepared):
+        key = self._key(described)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            if key not in self._last:
+                raise ImpCassetteMiss(prepared.method, prepared.url)
+            return self._last[key]
+
+    @staticmethod
+    def _build_response(recorded, prepared):
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response._content = json.dumps(recorded['body'], ensure_ascii=False).encode('utf-8')
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = "application/json; charset=utf-8"
+        response.url = prepared.url
+        response.request = prepared
+        return response
@@ -1,23 +1,50 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from requests import Session
 from requests.adapters import HTTPAdapter
 
 from .base import IamportAuth, IamportResponse
 from .errors import ImpUnAuthorized, ImpApiError
-from .api import Payments, Subscribe
-from .consts import IAMPORT_API_URL
+from .analytics import GROUP_DAY, PaymentAggregate, split_windows
+from .api import Banks, Cards, Escrows, Payments, Receipts, Subscribe, VBanks
+from .bulk import BulkRunner, RateLimiter, is_retryable
+from .codes import BANK_CODES_SNAPSHOT, CARD_CODES_SNAPSHOT, CodeTable
+from .index import MerchantIndex
+from .scheduler import PRIORITY_BACKGROUND, ScheduledTransport, background, priority
+from .consts import IAMPORT_API_URL, IMP_STATUS_ALL
+from .transports import TRANSPORT_ERRORS, TRANSPORT_REQUESTS, build_transport
+
+
+def _same_card(masked, card_number):
+    """마스킹된 카드번호의 남은 앞/뒤 자리가 card_number와 일치하는지 확인합니다. 비교할 숫자가 없으면 False를 반환합니다."""
+    masked = "".join(c for c in masked or "" if c.isdigit() or c == "*")
+    digits = "".join(c for c in card_number or "" if c.isdigit())
+    if "*" not in masked:
+        return bool(masked) and masked == digits
+    head, tail = masked[:masked.index("*")], masked[masked.rindex("*") + 1:]
+    return bool(head or tail) and digits.startswith(head) and digits.endswith(tail)
 
 
 class Iamporter:
     """Iamport Client 객체
     api-level의 api Class를 보다 사용하기 편하게 wrapping한 객체
+    하나의 인스턴스를 여러 스레드에서 함께 사용할 수 있습니다. 사용이 끝나면 close()를 호출하거나 with 문으로 사용해주세요.
 
     Attributes:
         imp_auth (IamportAuth): 아임포트 인증 인스턴스
         imp_url (str): Iamport REST API Host
-        requests_session (Session): 아임포트 API 호출에 사용될 세션 객체
+        requests_session (Session): 아임포트 API 호출에 사용될 세션 객체. requests 이외의 Transport를 사용하면 None입니다.
+        transport (BaseTransport): 아임포트 API 호출에 사용될 Transport
+        archive (PaymentArchive): 더 이상 변하지 않는 결제건 저장소
+        merchant_index (MerchantIndex): merchant_uid → imp_uid 대응표
+        bank_codes (CodeTable): 은행 코드표. 네트워크 없이 조회되며 bank_codes.start()로 백그라운드 갱신을 시작할 수 있습니다.
+        card_codes (CodeTable): 카드사 코드표. 네트워크 없이 조회되며 card_codes.start()로 백그라운드 갱신을 시작할 수 있습니다.
     """
 
-    def __init__(self, imp_key=None, imp_secret=None, imp_auth=None, imp_url=IAMPORT_API_URL):
+    def __init__(self, imp_key=None, imp_secret=None, imp_auth=None, imp_url=IAMPORT_API_URL, session=None,
+                 transport=None, archive=None, merchant_index_size=0, scheduler=None, hedging=None):
         """
         imp_key와 imp_secret을 전달하거나 IamportAuth 인스턴스를 직접 imp_auth로 넘겨 초기화할 수 있습니다.
 
@@ -26,27 +53,71 @@ class Iamporter:
             imp_secret (str): Iamport REST API Secret
             imp_auth (IamportAuth): IamportAuth 인증 인스턴스
             imp_url (str): Iamport REST API Host. 기본값은 https://api.iamport.kr/
+            session (Session): API 호출에 사용할 세션 객체. 누락 시 재시도 3회가 설정된 세션을 새로 만듭니다.
+                (iamporter.cassette.Cassette를 넘겨 요청을 녹화/재생할 수 있습니다.)
+            transport (str or BaseTransport): API 호출에 사용할 Transport. requests(기본값), urllib3, async 중 하나 또는
+                BaseTransport 인스턴스를 지정할 수 있습니다. requests 이외의 Transport를 사용하면 session은 무시됩니다.
+            archive (PaymentArchive): 더 이상 변하지 않는 결제건을 보관할 저장소. 지정하면 보관된 결제건을 imp_uid로 조회할 때 API를 호출하지 않습니다.
+            merchant_index_size (int): API 응답에서 학습해 기억할 merchant_uid → imp_uid 대응 수. 0이면 학습하지 않습니다. 기본값 0
+                지정하면 find_payment(merchant_uid=...)가 검색 API 대신 학습된 imp_uid로 조회하므로, 같은 merchant_uid로 이후에
+                새 결제가 시도되었지만 아직 학습되지 않았다면 이전 시도의 결제건이 반환될 수 있습니다.
+            scheduler (RequestScheduler): 우선순위 등급별로 동시 요청 자리를 나눠줄 스케줄러. 대량 작업 메소드는 background,
+                그 외 요청은 interactive 등급으로 보냅니다. (iamporter.scheduler.priority로 직접 지정할 수도 있습니다.)
+            hedging (HedgePolicy): 조회(GET) 요청에 적용할 헤징 정책. 누락 시 헤징하지 않습니다.
         """
+        if not (isinstance(imp_auth, IamportAuth) or (imp_key and imp_secret)):
+            raise ImpUnAuthorized("인증정보가 전달되지 않았습니다.")
+
+        self.imp_url = imp_url
+        self.archive = archive
+        self.hedging = hedging
+        self.bank_codes = CodeTable(background(self.find_banks), BANK_CODES_SNAPSHOT)
+        self.card_codes = CodeTable(background(self.find_cards), CARD_CODES_SNAPSHOT)
+        self.merchant_index = MerchantIndex(merchant_index_size) if merchant_index_size else None
+
+        self._owns_session = not isinstance(session, Session)
+        # 전달받은 세션을 사용하는 requests Transport는 닫으면 그 세션까지 닫히므로 직접 만든 것으로 보지 않습니다.
+        self._owns_transport = (transport is None or isinstance(transport, str)) and (
+            self._owns_session or transport not in (None, TRANSPORT_REQUESTS))
+        if isinstance(session, Session):
+            self.requests_session = session
+        elif transport in (None, TRANSPORT_REQUESTS):
+            self.requests_session = Session()
+            requests_adapter = HTTPAdapter(max_retries=3)
+            self.requests_session.mount('https://', requests_adapter)
+        else:  # 다른 Transport는 세션을 사용하지 않습니다.
+            self.requests_session = None
+        # 직접 만든 세션은 스레드별로 복사해 사용하고, 전달받은 세션(Cassette 등)은 그대로 사용합니다.
+        self.transport = build_transport(transport, session=self.requests_session, per_thread=self._owns_session)
+        if scheduler is not None:
+            self.transport = ScheduledTransport(self.transport, scheduler)
+
         if isinstance(imp_auth, IamportAuth):
             self.imp_auth = imp_auth
-        elif imp_key and imp_secret:
-            self.imp_auth = IamportAuth(imp_key, imp_secret, imp_url=imp_url)
         else:
-            raise ImpUnAuthorized("인증정보가 전달되지 않았습니다.")
+            self.imp_auth = IamportAuth(imp_key, imp_secret, imp_url=imp_url, transport=self.transport)
 
-        self.imp_url = imp_url
+    def __enter__(self):
+        return self
 
-        self.requests_session = Session()
-        requests_adapter = HTTPAdapter(max_retries=3)
-        self.requests_session.mount('https://', requests_adapter)
+    def __exit__(self, *args):
+        self.close()
 
-    def __del__(self):
-        if getattr(self, 'requests_session', None):
+    def close(self):
+        """클라이언트가 직접 만든 세션과 Transport를 닫고 코드표 갱신을 중단합니다.
+        다른 스레드가 아직 클라이언트를 사용 중일 수 있으므로 가비지 컬렉션 시점에는 자동으로 닫지 않습니다.
+        """
+        self.bank_codes.stop()
+        self.card_codes.stop()
+        if self._owns_transport:
+            self.transport.close()
+        if self._owns_session and self.requests_session is not None:
             self.requests_session.close()
 
     @property
     def _api_kwargs(self):
-        return {'auth': self.imp_auth, 'session': self.requests_session, 'imp_url': self.imp_url}
+        return {'auth': self.imp_auth, 'session': self.requests_session, 'imp_url': self.imp_url,
+                'transport': self.transport, 'hedging': self.hedging}
 
     def _process_response(self, response):
         """
@@ -60,8 +131,32 @@ class Iamporter:
             raise ImpUnAuthorized(response.message)
         if not response.is_succeed:
             raise ImpApiError(response)
+        if self.merchant_index is not None:
+            self._learn(response.data)
         return response.data
 
+    def _learn(self, data):
+        if isinstance(data, list):
+            self.merchant_index.learn_many(item for item in data if isinstance(item, dict))
+        elif isinstance(data, dict):
+            if isinstance(data.get('list'), list):
+                self._learn(data['list'])
+            else:
+                self.merchant_index.learn(data)
+
+    def learn_webhook(self, payload):
+        """아임포트 웹훅 본문에서 merchant_uid와 imp_uid의 대응을 학습합니다.
+
+        Args:
+            payload (dict): 웹훅 본문 (imp_uid, merchant_uid, status)
+        """
+        if self.merchant_index is not None:
+            self.merchant_index.learn(payload)
+
+    def _archive(self, payments):
+        if self.archive is not None:
+            self.archive.store(payments)
+
     def find_payment(self, imp_uid=None, merchant_uid=None):
         """아임포트 고유번호 또는 가맹점지정 고유번호로 결제내역을 확인합니다
 
@@ -72,17 +167,132 @@ class Iamporter:
         Returns:
             dict
         """
+        if not (imp_uid or merchant_uid):
+            raise KeyError('imp_uid와 merchant_uid 중 하나를 반드시 지정해야합니다.')
+
+        if imp_uid and self.archive is not None:  # merchant_uid의 결제건은 새로 시도될 수 있으므로 imp_uid 조회만 보관소를 사용합니다.
+            archived = self.archive.get(imp_uid)
+            if archived is not None:
+                return archived
+
         api_instance = Payments(**self._api_kwargs)
+        if not imp_uid and self.merchant_index is not None:
+            payment = self._find_indexed_payment(api_instance, merchant_uid)
+            if payment is not None:
+                return payment
+
         if imp_uid:
             response = api_instance.get(imp_uid)
-        elif merchant_uid:
-            response = api_instance.get_find(merchant_uid)
         else:
-            raise KeyError('imp_uid와 merchant_uid 중 하나를 반드시 지정해야합니다.')
+            response = api_instance.get_find(merchant_uid)
 
-        return self._process_response(response)
+        payment = self._process_response(response)
+        self._archive([payment])
+        return payment
+
+    def _find_indexed_payment(self, api_instance, merchant_uid):
+        """학습된 imp_uid가 있으면 검색 API 대신 imp_uid로 조회합니다. 대응이 맞지 않으면 None을 반환합니다.
+        같은 merchant_uid의 더 최근 결제건이 아직 학습되지 않았다면 이전 시도의 결제건이 반환될 수 있습니다.
+        """
+        imp_uid = self.merchant_index.get(merchant_uid)
+        if imp_uid is None:
+            return None
+
+        response = api_instance.get(imp_uid)
+        if response.is_succeed and response.data.get('merchant_uid') == merchant_uid:
+            payment = self._process_response(response)
+            self._archive([payment])
+            return payment
+        if response.status == 401:
+            raise ImpUnAuthorized(response.message)
+        self.merchant_index.forget(merchant_uid)
+        return None
+
+    def find_payments(self, imp_uids=None):
+        """여러 개의 아임포트 고유번호로 결제내역을 한 번에 조회합니다
+
+        Args:
+            imp_uids (list): 아임포트 고유번호 목록 (최대 100개)
+
+        Returns:
+            list: imp_uids 순서대로 정렬된 결제내역. 존재하지 않는 결제건은 제외됩니다.
+        """
+        if not imp_uids:
+            raise KeyError('imp_uids는 필수값입니다.')
+
+        found = {}
+        if self.archive is not None:
+            for imp_uid in imp_uids:
+                archived = self.archive.get(imp_uid)
+                if archived is not None:
+                    found[imp_uid] = archived
+
+        missing = [imp_uid for imp_uid in imp_uids if imp_uid not in found]
+        if missing:
+            api_instance = Payments(**self._api_kwargs)
+            response = api_instance.get_list(missing)
+
+            payments = self._process_response(response)
+            self._archive(payments)
+            found.update((payment['imp_uid'], payment) for payment in payments)
+
+        return [found[imp_uid] for imp_uid in imp_uids if imp_uid in found]
+
+    def scan_payments(self, payment_status=IMP_STATUS_ALL, search_from=None, search_to=None, sorting=None, limit=100):
+        """상태별 결제내역을 페이지 단위로 끝까지 조회합니다.
+        페이지는 필요할 때 하나씩 요청하므로, 결과를 모두 메모리에 올리지 않고 순회할 수 있습니다.
+
+        Args:
+            payment_status (str): 조회할 결제 상태. 기본값 all
+            search_from (int): 시간별 검색 시작 시각(>=) UNIX TIMESTAMP (Payments.get_status 참조)
+            search_to (int): 시간별 검색 종료 시각(<=) UNIX TIMESTAMP (Payments.get_status 참조)
+            sorting (str): 정렬기준. 기본값은 -started
+            limit (int): 페이지당 결제건수 (최대 100). 기본값 100
+
+        Yields:
+            dict
+        """
+        api_instance = Payments(**self._api_kwargs)
+        page = 1
+        while page:
+            with priority(PRIORITY_BACKGROUND):
+                response = api_instance.get_status(payment_status, page=page, limit=limit, search_from=search_from,
+                                                   search_to=search_to, sorting=sorting)
+            data = self._process_response(response)
+            payments = data.get('list') or []
+            self._archive(payments)
+            for payment in payments:
+                yield payment
+            page = data.get('next') if payments else None
+
+    def aggregate_payments(self, search_from, search_to, group_by=(GROUP_DAY,), payment_status=IMP_STATUS_ALL,
+                           window=24 * 60 * 60, max_workers=4):
+        """결제내역을 페이지 단위로 조회하며 그룹별 건수, 결제금액, 취소금액을 집계합니다.
+        조회 구간을 window초 단위로 나눠 max_workers개의 스레드가 구간별로 집계한 뒤 합치므로, 결제내역 전체를 메모리에 올리지 않습니다.
 
-    def cancel_payment(self, imp_uid=None, merchant_uid=None, amount=None, tax_free=None, reason=None):
+        Args:
+            search_from (int): 시간별 검색 시작 시각(>=) UNIX TIMESTAMP
+            search_to (int): 시간별 검색 종료 시각(<=) UNIX TIMESTAMP
+            group_by (tuple): 그룹 기준 (day, pg_provider, pay_method, status). 기본값 day
+            payment_status (str): 조회할 결제 상태. 기본값 all
+            window (int): 구간 길이(초). 기본값 1일
+            max_workers (int): 동시에 조회할 최대 구간 수. 기본값 4
+
+        Returns:
+            PaymentAggregate
+        """
+        def aggregate(bounds):
+            return PaymentAggregate(group_by).update(
+                self.scan_payments(payment_status, search_from=bounds[0], search_to=bounds[1]))
+
+        result = PaymentAggregate(group_by)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for partial in executor.map(aggregate, split_windows(search_from, search_to, window)):
+                result.merge(partial)
+        return result
+
+    def cancel_payment(self, imp_uid=None, merchant_uid=None, amount=None, tax_free=None, reason=None, checksum=None,
+                       refund_holder=None, refund_bank=None, refund_account=None):
         """승인된 결제를 취소합니다.
 
         Args:
@@ -91,19 +301,28 @@ class Iamporter:
             amount (float): 취소 요청 금액. 누락 시 전액을 취소합니다.
             tax_free (float): 취소 요청 금액 중 면세 금액. 누락 시 0원으로 간주합니다.
             reason (str): 취소 사유
+            checksum (float): 취소 요청 전 취소 가능한 잔액. 지정하면 아임포트가 실제 잔액과 다른 경우 취소를 거절합니다.
+            refund_holder (str): 환불계좌 예금주 (가상계좌취소시 필수)
+            refund_bank (str): 환불계좌 은행코드 또는 은행명 (가상계좌취소시 필수). 은행코드는 그대로 전달되며, 은행 코드표에 없는 은행명이면 ValueError가 발생합니다.
+            refund_account (str): 환불계좌 계좌번호 (가상계좌취소시 필수)
 
         Returns:
             dict
         """
         if not (imp_uid or merchant_uid):
             raise KeyError('imp_uid와 merchant_uid 중 하나를 반드시 지정해야합니다.')
+        if refund_bank:
+            refund_bank = self.bank_codes.resolve(refund_bank)
 
         api_instance = Payments(**self._api_kwargs)
         response = api_instance.post_cancel(imp_uid=imp_uid, merchant_uid=merchant_uid,
-                                            amount=amount, tax_free=tax_free,
-                                            reason=reason, )
+                                            amount=amount, tax_free=tax_free, checksum=checksum,
+                                            reason=reason, refund_holder=refund_holder,
+                                            refund_bank=refund_bank, refund_account=refund_account, )
 
-        return self._process_response(response)
+        payment = self._process_response(response)
+        self._archive([payment])
+        return payment
 
     def create_billkey(self, customer_uid=None, card_number=None, expiry=None, birth=None, pwd_2digit=None, pg=None,
                        customer_info=None):
@@ -136,6 +355,61 @@ class Iamporter:
 
         return self._process_response(response)
 
+    def create_billkeys(self, cards, max_workers=4, rate=None, checkpoint=None):
+        """여러 카드의 빌링키를 동시에 발급합니다. 다른 PG사에서 빌링키를 이전할 때 사용합니다.
+        네트워크 오류나 5xx 응답처럼 발급 여부가 불분명한 경우에만 find_billkey로 실제 발급 여부를 확인하며,
+        조회된 빌링키의 마스킹된 카드번호가 요청한 카드번호와 일치할 때만 발급된 것으로 봅니다. 확인 조회도 rate 제한에 포함됩니다.
+        각 항목의 카드정보(card_number, expiry, birth, pwd_2digit)는 처리가 끝나는 즉시 dict에서 제거됩니다.
+
+        Args:
+            cards (iterable): create_billkey의 인자를 담은 dict들. customer_info 대신 customer_name, customer_tel,
+                customer_email, customer_addr, customer_postcode 키를 사용할 수도 있습니다. (iamporter.bulk.read_csv 참조)
+            max_workers (int): 최대 동시 요청 수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            checkpoint (str or Checkpoint): 체크포인트 파일 경로. 지정하면 이미 발급에 성공한 건은 건너뜁니다.
+
+        Yields:
+            BulkResult: key는 customer_uid입니다.
+        """
+        rate_limiter = RateLimiter(rate, burst=max_workers) if rate else None
+        func = functools.partial(self._create_billkey_item, rate_limiter=rate_limiter)
+        runner = BulkRunner(background(func), key=lambda card: card['customer_uid'], max_workers=max_workers,
+                            checkpoint=checkpoint)
+        return runner.run(cards)
+
+    def _create_billkey_item(self, card, rate_limiter=None):
+        customer_info = card.get('customer_info') or {
+            'name': card.get('customer_name'),
+            'tel': card.get('customer_tel'),
+            'email': card.get('customer_email'),
+            'addr': card.get('customer_addr'),
+            'postcode': card.get('customer_postcode'),
+        }
+        try:
+            if rate_limiter:
+                rate_limiter.acquire()
+            try:
+                return self.create_billkey(customer_uid=card['customer_uid'], card_number=card.get('card_number'),
+                                           expiry=card.get('expiry'), birth=card.get('birth'),
+                                           pwd_2digit=card.get('pwd_2digit'), pg=card.get('pg'),
+                                           customer_info=customer_info)
+            except TRANSPORT_ERRORS + (ImpApiError,) as e:
+                if isinstance(e, ImpApiError) and e.response.status < 500:
+                    raise
+                if rate_limiter:
+                    rate_limiter.acquire()
+                try:  # 요청이 처리되었는지 알 수 없는 경우에만 발급 여부를 확인합니다.
+                    found = self.find_billkey(customer_uid=card['customer_uid'])
+                except ImpApiError:
+                    raise e
+                # 같은 customer_uid에 이전부터 다른 카드가 등록되어 있을 수 있으므로 카드번호가 일치해야 발급된 것으로 봅니다.
+                if not _same_card(found.get('card_number'), card.get('card_number')):
+                    raise e
+                return found
+        finally:
+            for field in ('card_number', 'expiry', 'birth', 'pwd_2digit'):
+                card.pop(field, None)
+
     def find_billkey(self, customer_uid=None):
         """빌링키 정보를 조회합니다
 
@@ -225,3 +499,281 @@ class Iamporter:
                                                         custom_data=custom_data)
 
         return self._process_response(response)
+
+    def issue_receipt(self, imp_uid=None, identifier=None, identifier_type=None, receipt_type=None, tax_free=None,
+                      buyer_info=None):
+        """결제건에 대해 현금영수증을 발급합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            identifier (str): 현금영수증 발행대상 식별정보 (국세청현금영수증카드, 휴대폰번호, 주민등록번호, 사업자등록번호)
+            identifier_type (str): 현금영수증 발행대상 식별정보 유형 (person, business, phone, taxcard)
+            receipt_type (str): 현금영수증 발행 유형 (person: 소득공제용, company: 지출증빙용). 기본값 person
+            tax_free (float): 현금영수증 발행금액 중 면세금액
+            buyer_info (dict): 구매자 정보 (name, email, tel)
+
+        Returns:
+            dict
+        """
+        if not (imp_uid and identifier):
+            raise KeyError('imp_uid, identifier는 필수값입니다.')
+        if not buyer_info:
+            buyer_info = {}
+
+        api_instance = Receipts(**self._api_kwargs)
+        response = api_instance.post(imp_uid, identifier, identifier_type=identifier_type, type=receipt_type,
+                                     buyer_name=buyer_info.get('name'),
+                                     buyer_email=buyer_info.get('email'),
+                                     buyer_tel=buyer_info.get('tel'),
+                                     tax_free=tax_free)
+
+        return self._process_response(response)
+
+    def cancel_receipt(self, imp_uid=None):
+        """발급된 현금영수증을 취소합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+
+        Returns:
+            dict
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+
+        api_instance = Receipts(**self._api_kwargs)
+        response = api_instance.delete(imp_uid)
+
+        return self._process_response(response)
+
+    def issue_receipts(self, receipts, max_workers=4, rate=None, checkpoint=None):
+        """여러 결제건에 대해 현금영수증을 동시에 발급합니다.
+
+        Args:
+            receipts (iterable): issue_receipt의 인자를 담은 dict들. 각 dict에는 imp_uid가 반드시 포함되어야합니다.
+            max_workers (int): 최대 동시 요청 수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            checkpoint (str or Checkpoint): 체크포인트 파일 경로. 지정하면 이미 발급에 성공한 건은 건너뜁니다.
+
+        Yields:
+            BulkResult: key는 imp_uid입니다.
+        """
+        runner = BulkRunner(background(lambda receipt: self.issue_receipt(**receipt)),
+                            key=lambda receipt: receipt['imp_uid'],
+                            max_workers=max_workers, rate=rate, checkpoint=checkpoint)
+        return runner.run(receipts)
+
+    def cancel_receipts(self, imp_uids, max_workers=4, rate=None, checkpoint=None):
+        """여러 결제건의 현금영수증을 동시에 취소합니다.
+
+        Args:
+            imp_uids (iterable): 아임포트 고유번호들
+            max_workers (int): 최대 동시 요청 수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            checkpoint (str or Checkpoint): 체크포인트 파일 경로. 지정하면 이미 취소에 성공한 건은 건너뜁니다.
+
+        Yields:
+            BulkResult: key는 imp_uid입니다.
+        """
+        runner = BulkRunner(background(self.cancel_receipt), max_workers=max_workers, rate=rate,
+                            checkpoint=checkpoint)
+        return runner.run(imp_uids)
+
+    def create_vbank(self, merchant_uid=None, amount=None, vbank_code=None, vbank_due=None, vbank_holder=None,
+                     name=None, pg=None, buyer_info=None, notice_url=None, custom_data=None):
+        """결제창 없이 가상계좌를 발급합니다.
+
+        Args:
+            merchant_uid (str): 가맹점 거래 고유번호
+            amount (float): 결제금액
+            vbank_code (str): 은행구분코드
+            vbank_due (int): 가상계좌 입금기한 UNIX TIMESTAMP
+            vbank_holder (str): 가상계좌 예금주명
+            name (str): 주문명
+            pg (str): 가상계좌 발급 API를 지원하는 PG설정이 2개 이상인 경우, 발급이 진행되길 원하는 PG사를 지정하실 수 있습니다.
+            buyer_info (dict): 구매자 정보 (name, tel, email, addr, postcode)
+            notice_url (str): 입금 통보를 받을 URL
+            custom_data (str): 거래정보와 함께 저장할 추가 정보
+
+        Returns:
+            dict
+        """
+        if not (merchant_uid and amount and vbank_code and vbank_due and vbank_holder):
+            raise KeyError('merchant_uid, amount, vbank_code, vbank_due, vbank_holder는 필수값입니다.')
+        if not buyer_info:
+            buyer_info = {}
+
+        api_instance = VBanks(**self._api_kwargs)
+        response = api_instance.post(merchant_uid, amount, vbank_code, vbank_due, vbank_holder, name=name, pg=pg,
+                                     buyer_name=buyer_info.get('name'),
+                                     buyer_email=buyer_info.get('email'),
+                                     buyer_tel=buyer_info.get('tel'),
+                                     buyer_addr=buyer_info.get('addr'),
+                                     buyer_postcode=buyer_info.get('postcode'),
+                                     notice_url=notice_url, custom_data=custom_data)
+
+        return self._process_response(response)
+
+    def update_vbank(self, imp_uid=None, amount=None, vbank_due=None):
+        """발급된 가상계좌의 입금금액 또는 입금기한을 변경합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            amount (float): 변경할 입금금액
+            vbank_due (int): 변경할 입금기한 UNIX TIMESTAMP
+
+        Returns:
+            dict
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+        if not (amount or vbank_due):
+            raise KeyError('amount와 vbank_due 중 하나 이상은 반드시 포함되어야합니다.')
+
+        api_instance = VBanks(**self._api_kwargs)
+        response = api_instance.put(imp_uid, amount=amount, vbank_due=vbank_due)
+
+        return self._process_response(response)
+
+    def delete_vbank(self, imp_uid=None):
+        """입금되지 않은 가상계좌를 말소합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+
+        Returns:
+            dict
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+
+        api_instance = VBanks(**self._api_kwargs)
+        response = api_instance.delete(imp_uid)
+
+        return self._process_response(response)
+
+    def register_escrow_logis(self, imp_uid=None, sender=None, receiver=None, logis=None):
+        """에스크로 결제건의 배송정보를 등록합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            sender (dict): 발신자 정보 (name, tel, addr, postcode)
+            receiver (dict): 수신자 정보 (name, tel, addr, postcode)
+            logis (dict): 배송 정보 (company, invoice, sent_at, receive_at, address)
+
+        Returns:
+            dict
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+        if not (sender and receiver and logis):
+            raise KeyError('sender, receiver, logis는 필수값입니다.')
+
+        api_instance = Escrows(**self._api_kwargs)
+        response = api_instance.post_logis(imp_uid, sender=sender, receiver=receiver, logis=logis)
+
+        return self._process_response(response)
+
+    def update_escrow_logis(self, imp_uid=None, sender=None, receiver=None, logis=None):
+        """등록된 에스크로 배송정보를 수정합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            sender (dict): 발신자 정보 (name, tel, addr, postcode)
+            receiver (dict): 수신자 정보 (name, tel, addr, postcode)
+            logis (dict): 배송 정보 (company, invoice, sent_at, receive_at, address)
+
+        Returns:
+            dict
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+        if not (sender and receiver and logis):
+            raise KeyError('sender, receiver, logis는 필수값입니다.')
+
+        api_instance = Escrows(**self._api_kwargs)
+        response = api_instance.put_logis(imp_uid, sender=sender, receiver=receiver, logis=logis)
+
+        return self._process_response(response)
+
+    def register_escrows(self, shipments, max_workers=4, rate=None, checkpoint=None, retries=2, backoff=0.5):
+        """여러 에스크로 결제건의 배송정보를 동시에 등록합니다.
+        전송 계층 오류, 429, 5xx 응답은 backoff초부터 두 배씩 늘려 기다린 뒤 최대 retries번 다시 시도하고, 그 외 4xx 응답은 바로 실패로 처리합니다.
+        처리 여부가 불분명했던 요청 뒤에 등록이 거절되면 앞선 요청이 반영된 것으로 보고 수정 API로 같은 정보를 한 번 더 보냅니다.
+        재시도 요청도 rate 제한에 포함됩니다. 결과는 iamporter.bulk.BulkReport.collect로 요약할 수 있습니다.
+
+        Args:
+            shipments (iterable): register_escrow_logis의 인자를 담은 dict들. sender, receiver, logis 대신
+                sender_name, receiver_tel, logis_invoice처럼 접두어를 붙인 키를 사용할 수도 있습니다. (iamporter.bulk.read_csv 참조)
+            max_workers (int): 최대 동시 요청 수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            checkpoint (str or Checkpoint): 체크포인트 파일 경로. 지정하면 이미 등록에 성공한 건은 건너뜁니다.
+            retries (int): 항목별 최대 재시도 횟수. 기본값 2
+            backoff (float): 첫 재시도 전 대기시간(초). 기본값 0.5
+
+        Yields:
+            BulkResult: key는 imp_uid입니다.
+        """
+        rate_limiter = RateLimiter(rate, burst=max_workers) if rate else None
+        func = functools.partial(self._register_escrow_item, rate_limiter=rate_limiter, retries=retries,
+                                 backoff=backoff)
+        runner = BulkRunner(background(func), key=lambda shipment: shipment['imp_uid'], max_workers=max_workers,
+                            checkpoint=checkpoint)
+        return runner.run(shipments)
+
+    @staticmethod
+    def _prefixed(shipment, prefix):
+        if shipment.get(prefix):
+            return shipment[prefix]
+        prefix += '_'
+        return {key[len(prefix):]: value for key, value in shipment.items()
+                if key.startswith(prefix) and value is not None}
+
+    def _register_escrow_item(self, shipment, rate_limiter=None, retries=2, backoff=0.5):
+        kwargs = {
+            'imp_uid': shipment['imp_uid'],
+            'sender': self._prefixed(shipment, 'sender'),
+            'receiver': self._prefixed(shipment, 'receiver'),
+            'logis': self._prefixed(shipment, 'logis'),
+        }
+        ambiguous = False
+        for attempt in range(retries + 1):
+            if rate_limiter:
+                rate_limiter.acquire()
+            try:
+                return self.register_escrow_logis(**kwargs)
+            except TRANSPORT_ERRORS + (ImpApiError,) as e:
+                if is_retryable(e) and attempt < retries:
+                    ambiguous = ambiguous or not isinstance(e, ImpApiError) or e.response.status >= 500
+                    time.sleep(backoff * 2 ** attempt)
+                    continue
+                if not (ambiguous and isinstance(e, ImpApiError) and 400 <= e.response.status < 500):
+                    raise
+                if rate_limiter:
+                    rate_limiter.acquire()
+                try:  # 앞선 등록 요청이 이미 반영되어 거절된 경우입니다.
+                    return self.update_escrow_logis(**kwargs)
+                except ImpApiError:
+                    raise e
+
+    def find_banks(self):
+        """은행 코드 목록을 조회합니다. 코드 변환만 필요하다면 네트워크를 사용하지 않는 bank_codes를 사용해주세요.
+
+        Returns:
+            list
+        """
+        api_instance = Banks(**self._api_kwargs)
+        response = api_instance.get_list()
+
+        return self._process_response(response)
+
+    def find_cards(self):
+        """카드사 코드 목록을 조회합니다. 코드 변환만 필요하다면 네트워크를 사용하지 않는 card_codes를 사용해주세요.
+
+        Returns:
+            list
+        """
+        api_instance = Cards(**self._api_kwargs)
+        response = api_instance.get_list()
+
+        return self._process_response(response)
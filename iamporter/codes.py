@@ -0,0 +1,164 @@
+import threading
+
+# 금융결제원 은행 표준코드 (Banks API 응답이 없을 때 사용하는 기본값)
+BANK_CODES_SNAPSHOT = (
+    ("002", "KDB산업은행"),
+    ("003", "IBK기업은행"),
+    ("004", "KB국민은행"),
+    ("007", "수협은행"),
+    ("011", "NH농협은행"),
+    ("012", "지역농축협"),
+    ("020", "우리은행"),
+    ("023", "SC제일은행"),
+    ("027", "한국씨티은행"),
+    ("031", "대구은행"),
+    ("032", "부산은행"),
+    ("034", "광주은행"),
+    ("035", "제주은행"),
+    ("037", "전북은행"),
+    ("039", "경남은행"),
+    ("045", "새마을금고"),
+    ("048", "신협"),
+    ("050", "저축은행"),
+    ("064", "산림조합"),
+    ("071", "우체국"),
+    ("081", "하나은행"),
+    ("088", "신한은행"),
+    ("089", "케이뱅크"),
+    ("090", "카카오뱅크"),
+    ("092", "토스뱅크"),
+)
+
+# 아임포트 카드사 코드 (Cards API 응답이 없을 때 사용하는 기본값)
+CARD_CODES_SNAPSHOT = (
+    ("361", "BC카드"),
+    ("364", "광주카드"),
+    ("365", "삼성카드"),
+    ("366", "신한카드"),
+    ("367", "현대카드"),
+    ("368", "롯데카드"),
+    ("369", "수협카드"),
+    ("370", "씨티카드"),
+    ("371", "NH카드"),
+    ("372", "전북카드"),
+    ("373", "제주카드"),
+    ("374", "하나카드"),
+    ("381", "KB국민카드"),
+    ("041", "우리카드"),
+    ("071", "우체국카드"),
+)
+
+
+class CodeTable:
+    """코드 ↔ 이름 조회표
+    내장된 기본값으로 처음 조회할 때 색인을 만들고, refresh 또는 start로 시작한 백그라운드 갱신이 API 응답으로 색인을 통째로 교체합니다.
+    API의 이름이 기본값과 달라도(KB국민은행 / 국민은행) 갱신 후 기본값의 이름으로 계속 조회할 수 있습니다.
+    조회는 항상 메모리의 색인만 사용하므로 네트워크를 기다리지 않습니다.
+
+    Attributes:
+        fetch (callable): {'code', 'name'} dict 목록을 반환하는 갱신 함수
+        refresh_interval (float): 백그라운드 갱신 주기(초)
+    """
+
+    def __init__(self, fetch, snapshot, refresh_interval=24 * 60 * 60):
+        """
+        Args:
+            fetch (callable): {'code', 'name'} dict 목록을 반환하는 갱신 함수
+            snapshot (tuple): (code, name) 기본값 목록
+            refresh_interval (float): 백그라운드 갱신 주기(초). 기본값 1일
+        """
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self._snapshot = snapshot
+        self._index = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _build_index(pairs, aliases=()):
+        by_code = dict(pairs)
+        by_name = {name: code for code, name in aliases if code in by_code}
+        by_name.update({name: code for code, name in by_code.items()})
+        return by_code, by_name
+
+    @property
+    def _current(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index(self._snapshot)
+                index = self._index
+        return index
+
+    def __contains__(self, code):
+        return code in self._current[0]
+
+    def __len__(self):
+        return len(self._current[0])
+
+    def items(self):
+        """(code, name) 목록을 반환합니다."""
+        return list(self._current[0].items())
+
+    def name(self, code):
+        """코드에 해당하는 이름을 반환합니다. 없으면 None을 반환합니다."""
+        return self._current[0].get(code)
+
+    def code(self, name):
+        """이름에 해당하는 코드를 반환합니다. 없으면 None을 반환합니다."""
+        return self._current[1].get(name)
+
+    def resolve(self, value):
+        """코드 또는 이름을 코드로 바꿉니다.
+        숫자로만 이루어진 값은 코드표에 없더라도(내장 코드표에 없는 증권사 등) 코드로 보고 그대로 반환합니다.
+
+        Args:
+            value (str): 코드 또는 이름
+
+        Returns:
+            str: 코드
+
+        Raises:
+            ValueError: 코드표에 없는 이름인 경우
+        """
+        if value in self or str(value).isdigit():
+            return value
+        code = self.code(value)
+        if code is None:
+            raise ValueError("알 수 없는 이름입니다. ({value})".format(value=value))
+        return code
+
+    def refresh(self):
+        """fetch로 최신 목록을 받아 색인을 교체합니다. 기본값의 이름은 같은 코드가 목록에 있는 동안 별칭으로 유지됩니다."""
+        items = self.fetch()
+        pairs = [(item['code'], item['name']) for item in items if item.get('code')]
+        if pairs:
+            self._index = self._build_index(pairs, aliases=self._snapshot)
+
+    def start(self, interval=None):
+        """백그라운드 스레드에서 주기적으로 refresh를 실행합니다. 갱신에 실패하면 기존 색인을 유지합니다.
+
+        Args:
+            interval (float): 갱신 주기(초). 누락 시 refresh_interval을 사용합니다.
+        """
+        if interval is not None:
+            self.refresh_interval = interval
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """백그라운드 갱신을 중단합니다."""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            self._stop_event.wait(self.refresh_interval)
@@ -14,3 +14,12 @@ class ImpUnAuthorized(Exception):
 
     def __str__(self):
         return "아임포트 인증 실패 (message={message})".format(message=self.message)
+
+
+class ImpCassetteMiss(Exception):
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+
+    def __str__(self):
+        return "카세트에 녹화되지 않은 요청 (method={method}, url={url})".format(method=self.method, url=self.url)
@@ -0,0 +1,131 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class HedgePolicy:
+    """멱등한 GET 요청의 꼬리 지연시간을 줄이기 위한 헤징 정책
+    요청이 최근 응답시간의 percentile 백분위수만큼 지나도 끝나지 않으면 같은 요청을 한 번 더 보내고, 먼저 도착한 응답을 사용합니다.
+    추가 요청은 전체 요청 수의 budget 비율을 넘지 않습니다. BaseApi._get에만 적용되며 POST/PUT/DELETE 요청은 헤징하지 않습니다.
+    요청은 여유 스레드가 있을 때만 스레드 풀에서 실행합니다. 여유 스레드가 없으면 대기열에 넣지 않고 호출한 스레드에서 헤징 없이 실행하며, 추가 요청도 보내지 않습니다.
+
+    Attributes:
+        percentile (float): 헤징 대기시간으로 사용할 응답시간 백분위수
+        min_delay (float): 최소 헤징 대기시간(초)
+        max_delay (float): 최대 헤징 대기시간(초). 응답시간 표본이 충분하지 않을 때도 이 값을 사용합니다.
+        budget (float): 전체 요청 중 추가 요청의 최대 비율
+    """
+
+    MIN_SAMPLES = 20
+    REFRESH_EVERY = 50
+
+    def __init__(self, percentile=95, min_delay=0.01, max_delay=1.0, budget=0.05, window=1000, max_workers=32):
+        """
+        Args:
+            percentile (float): 헤징 대기시간으로 사용할 응답시간 백분위수. 기본값 95
+            min_delay (float): 최소 헤징 대기시간(초). 기본값 0.01
+            max_delay (float): 최대 헤징 대기시간(초). 기본값 1.0
+            budget (float): 전체 요청 중 추가 요청의 최대 비율. 기본값 0.05
+            window (int): 응답시간과 예산을 계산할 최근 요청 수. 기본값 1000
+            max_workers (int): 요청을 실행할 최대 스레드 수. 동시 요청 수를 제한하지는 않습니다. 기본값 32
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)
+        self._hedge_count = 0
+        self._delay = max_delay
+        self._since_refresh = 0
+        self._idle_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    @property
+    def delay(self):
+        """현재 헤징 대기시간(초)"""
+        return self._delay
+
+    def _record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._since_refresh += 1
+            if len(self._latencies) >= self.MIN_SAMPLES and self._since_refresh >= min(
+                    self.REFRESH_EVERY, len(self._latencies)):
+                samples = sorted(self._latencies)
+                index = min(int(len(samples) * self.percentile / 100), len(samples) - 1)
+                self._delay = min(max(samples[index], self.min_delay), self.max_delay)
+                self._since_refresh = 0
+
+    def _spend(self, needed):
+        """요청 1건을 기록합니다. 추가 요청이 필요하고 예산이 남아있으면 True를 반환합니다."""
+        with self._lock:
+            allowed = bool(needed) and self._hedge_count + 1 <= self.budget * (len(self._hedged) + 1)
+            if len(self._hedged) == self._hedged.maxlen:
+                self._hedge_count -= self._hedged[0]
+            self._hedged.append(1 if allowed else 0)
+            self._hedge_count += 1 if allowed else 0
+            return allowed
+
+    def _reserve(self):
+        """여유 스레드가 있으면 하나를 예약하고 True를 반환합니다."""
+        with self._lock:
+            if self._idle_workers <= 0:
+                return False
+            self._idle_workers -= 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._idle_workers += 1
+
+    def _submit(self, func):
+        context = contextvars.copy_context()
+
+        def run():
+            try:
+                return context.run(func)
+            finally:
+                self._release()
+        return self._executor.submit(run)
+
+    def execute(self, func):
+        """func를 실행하고, 대기시간 안에 끝나지 않으면 한 번 더 실행해 먼저 끝난 결과를 반환합니다.
+
+        Args:
+            func (callable): 인자 없이 호출할 멱등한 요청 함수
+
+        Returns:
+            func의 반환값
+        """
+        started_at = time.monotonic()
+        if not self._reserve():
+            result = func()
+            self._spend(False)
+            self._record(time.monotonic() - started_at)
+            return result
+
+        primary = self._submit(func)
+        done, _ = wait([primary], timeout=self._delay)
+        hedge = not done and self._reserve()
+        if not self._spend(hedge):
+            if hedge:
+                self._release()
+            result = primary.result()
+            self._record(time.monotonic() - started_at)
+            return result
+
+        pending = {primary, self._submit(func)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda future: future.exception() is not None):
+                if future.exception() is None or not pending:
+                    self._record(time.monotonic() - started_at)
+                    return future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+
+class MerchantIndex:
+    """merchant_uid → imp_uid 대응표
+    API 응답에서 본 결제건의 merchant_uid와 imp_uid를 기억해, merchant_uid 조회를 느린 검색 API 대신 imp_uid 조회로 바꿀 수 있게 합니다.
+    최대 maxsize개까지 최근에 사용된 순서로 보관하고, 넘치면 가장 오래 사용되지 않은 항목부터 버립니다.
+    같은 merchant_uid의 결제건이 여러 개라면 Payments.get_find의 기본 정렬(-started)과 같도록 가장 최근에 요청된 결제건을 기억합니다.
+    이미 기억하는 결제건은 started_at이 알려져 있고 더 최근인 결제건으로만 교체되므로, 학습되지 않은 더 최근 결제건이 있다면 이전 결제건을 반환할 수 있습니다.
+
+    Attributes:
+        maxsize (int): 최대 보관 항목 수
+    """
+
+    def __init__(self, maxsize=10000):
+        """
+        Args:
+            maxsize (int): 최대 보관 항목 수. 기본값 10000
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, merchant_uid):
+        return merchant_uid in self._entries
+
+    def get(self, merchant_uid):
+        """merchant_uid에 대응하는 imp_uid를 반환합니다.
+
+        Args:
+            merchant_uid (str): 가맹점지정 고유번호
+
+        Returns:
+            str: 알 수 없으면 None
+        """
+        with self._lock:
+            entry = self._entries.get(merchant_uid)
+            if entry is None:
+                return None
+            self._entries.move_to_end(merchant_uid)
+            return entry[0]
+
+    def learn(self, payment):
+        """결제 정보에서 merchant_uid와 imp_uid를 기억합니다.
+
+        Args:
+            payment (dict): imp_uid와 merchant_uid를 포함하는 결제 정보 또는 웹훅 본문
+        """
+        imp_uid, merchant_uid = payment.get('imp_uid'), payment.get('merchant_uid')
+        if not (imp_uid and merchant_uid):
+            return
+        started_at = payment.get('started_at') or 0
+
+        with self._lock:
+            entry = self._entries.get(merchant_uid)
+            if entry is not None and entry[0] != imp_uid and not (started_at and started_at > entry[1]):
+                return
+            self._entries[merchant_uid] = (imp_uid, started_at or (entry[1] if entry else 0))
+            self._entries.move_to_end(merchant_uid)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def learn_many(self, payments):
+        for payment in payments:
+            self.learn(payment)
+
+    def forget(self, merchant_uid):
+        with self._lock:
+            self._entries.pop(merchant_uid, None)
@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .bulk import BulkResult, RateLimiter
+from .scheduler import background
+
+
+class RefundExecutor:
+    """(부분)환불 실행 객체
+    서로 다른 결제건의 환불은 병렬로 실행하고, 같은 imp_uid에 대한 환불은 요청된 순서대로 하나씩 실행합니다.
+    모든 환불 요청에는 취소 가능 잔액(checksum)을 함께 전달하여 초과 환불을 막습니다.
+
+    잔액은 결제건의 첫 환불 전에 한 번만 조회하고, 이후에는 취소 응답으로 갱신하므로 연속된 환불 사이에 다시 조회하지 않습니다.
+    대기 중인 환불이 모두 끝나거나 환불이 실패하면 해당 결제건의 잔액 정보를 버리고 다음 환불 때 다시 조회합니다.
+
+    Attributes:
+        client (Iamporter): 환불에 사용할 클라이언트
+        max_workers (int): 동시에 환불을 진행할 최대 결제건수
+        rate_limiter (RateLimiter): 초당 요청 수 제한. None이면 제한하지 않습니다.
+    """
+
+    def __init__(self, client, max_workers=4, rate=None):
+        """
+        Args:
+            client (Iamporter): 환불에 사용할 클라이언트
+            max_workers (int): 동시에 환불을 진행할 최대 결제건수. 기본값 4
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate, burst=max_workers) if rate else None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._balances = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def submit(self, imp_uid=None, amount=None, tax_free=None, reason=None,
+               refund_holder=None, refund_bank=None, refund_account=None):
+        """환불을 예약합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            amount (float): 취소 요청 금액. 누락 시 남은 금액 전액을 취소합니다.
+            tax_free (float): 취소 요청 금액 중 면세 금액
+            reason (str): 취소 사유
+            refund_holder (str): 환불계좌 예금주 (가상계좌취소시 필수)
+            refund_bank (str): 환불계좌 은행코드 (가상계좌취소시 필수)
+            refund_account (str): 환불계좌 계좌번호 (가상계좌취소시 필수)
+
+        Returns:
+            Future: 취소된 결제 정보(dict)를 결과로 갖습니다.
+        """
+        if not imp_uid:
+            raise KeyError('imp_uid는 필수값입니다.')
+
+        future = Future()
+        task = (future, {
+            'amount': amount,
+            'tax_free': tax_free,
+            'reason': reason,
+            'refund_holder': refund_holder,
+            'refund_bank': refund_bank,
+            'refund_account': refund_account,
+        })
+        with self._lock:
+            queue = self._queues.get(imp_uid)
+            if queue is not None:  # 같은 결제건의 환불이 진행 중이면 그 뒤에 줄을 세웁니다.
+                queue.append(task)
+                return future
+            self._queues[imp_uid] = deque([task])
+
+        self._executor.submit(background(self._drain), imp_uid)
+        return future
+
+    def run(self, refunds):
+        """환불들을 실행하고 끝나는 순서대로 결과를 반환합니다.
+
+        Args:
+            refunds (iterable): submit의 인자를 담은 dict들
+
+        Yields:
+            BulkResult: key는 imp_uid입니다.
+        """
+        pending = {}
+        for refund in refunds:
+            if len(pending) >= self.max_workers * 4:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._result(pending.pop(future), future)
+            pending[self.submit(**refund)] = refund['imp_uid']
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield self._result(pending.pop(future), future)
+
+    @staticmethod
+    def _result(imp_uid, future):
+        error = future.exception()
+        return BulkResult(imp_uid, error=error) if error else BulkResult(imp_uid, data=future.result())
+
+    def shutdown(self, wait=True):
+        """예약된 환불이 모두 끝날 때까지 기다린 뒤 실행 객체를 종료합니다."""
+        self._executor.shutdown(wait=wait)
+
+    def _drain(self, imp_uid):
+        while True:
+            with self._lock:
+                queue = self._queues[imp_uid]
+                if not queue:
+                    del self._queues[imp_uid]
+                    self._balances.pop(imp_uid, None)
+                    return
+                future, kwargs = queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._refund(imp_uid, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _refund(self, imp_uid, amount=None, **kwargs):
+        balance = self._balances.get(imp_uid)
+        if balance is None:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            payment = self.client.find_payment(imp_uid=imp_uid)
+            balance = payment['amount'] - payment['cancel_amount']
+            self._balances[imp_uid] = balance
+
+        if amount is not None and amount > balance:
+            raise ValueError('취소 요청 금액({amount})이 취소 가능 잔액({balance})보다 큽니다.'.format(
+                amount=amount, balance=balance))
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        try:
+            payment = self.client.cancel_payment(imp_uid=imp_uid, amount=amount, checksum=balance, **kwargs)
+        except Exception:
+            self._balances.pop(imp_uid, None)
+            raise
+
+        self._balances[imp_uid] = payment['amount'] - payment['cancel_amount']
+        return payment
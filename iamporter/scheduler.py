@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from .transports import BaseTransport
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+DEFAULT_WEIGHTS = {PRIORITY_INTERACTIVE: 4, PRIORITY_BACKGROUND: 1}
+DEFAULT_RESERVATIONS = {PRIORITY_INTERACTIVE: 2, PRIORITY_BACKGROUND: 0}
+
+_current_priority = contextvars.ContextVar('iamporter_priority', default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def priority(name):
+    """with 블록 안에서 보내는 API 요청의 우선순위 등급을 지정합니다.
+
+    Args:
+        name (str): 우선순위 등급 (interactive, background)
+    """
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def background(func):
+    """func 안에서 보내는 API 요청을 background 등급으로 보내도록 감싼 함수를 반환합니다.
+    스레드풀에서 실행되는 작업은 호출한 쪽의 우선순위를 물려받지 않으므로 작업 함수 자체를 감싸야합니다.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with priority(PRIORITY_BACKGROUND):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class _Ticket:
+    __slots__ = ('granted',)
+
+    def __init__(self):
+        self.granted = False
+
+
+class RequestScheduler:
+    """우선순위 등급별 요청 스케줄러
+    동시에 진행할 수 있는 요청 수(capacity)를 등급별 가중치에 따라 가중 공정 큐잉(weighted fair queuing)으로 나눠줍니다.
+    각 등급은 reservations만큼의 자리를 항상 예약해두므로, 대량 작업이 자리를 모두 차지해도 결제 요청은 바로 처리됩니다.
+    다른 등급이 쓰지 않는 자리는 예약분을 제외하고 누구나 사용할 수 있습니다.
+
+    Attributes:
+        capacity (int): 최대 동시 요청 수
+        weights (dict): 등급별 가중치
+        reservations (dict): 등급별 예약 자리 수
+    """
+
+    def __init__(self, capacity=10, weights=None, reservations=None):
+        """
+        Args:
+            capacity (int): 최대 동시 요청 수. 연결 풀 크기와 같게 맞추는 것이 좋습니다. 기본값 10
+            weights (dict): 등급별 가중치. 기본값 interactive 4, background 1
+            reservations (dict): 등급별 예약 자리 수. 기본값 interactive 2, background 0
+        """
+        self.capacity = capacity
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.reservations = dict(reservations or DEFAULT_RESERVATIONS)
+        if sum(self.reservations.values()) > capacity:
+            raise ValueError("예약 자리 수의 합이 capacity보다 클 수 없습니다.")
+
+        self._condition = threading.Condition()
+        self._in_use = {name: 0 for name in self.weights}
+        self._waiting = {name: deque() for name in self.weights}
+        self._finish_tags = {name: 0.0 for name in self.weights}
+        self._virtual_time = 0.0
+
+    def in_use(self, name=None):
+        """진행 중인 요청 수를 반환합니다. name을 지정하면 해당 등급의 요청 수만 반환합니다."""
+        with self._condition:
+            return self._in_use[name] if name else sum(self._in_use.values())
+
+    def _eligible(self, name):
+        free = self.capacity - sum(self._in_use.values())
+        if free <= 0:
+            return False
+        if self._in_use[name] < self.reservations.get(name, 0):
+            return True
+        reserved = sum(max(self.reservations.get(other, 0) - self._in_use[other], 0)
+                       for other in self._in_use if other != name)
+        return free > reserved
+
+    def _dispatch(self):
+        while True:
+            candidates = [name for name, queue in self._waiting.items() if queue and self._eligible(name)]
+            if not candidates:
+                return
+            name = min(candidates, key=lambda candidate: self._finish_tags[candidate])
+            self._waiting[name].popleft().granted = True
+            self._in_use[name] += 1
+            self._virtual_time = self._finish_tags[name]
+            self._finish_tags[name] += 1.0 / self.weights[name]
+            self._condition.notify_all()
+
+    def acquire(self, name=None):
+        """요청 자리를 얻을 때까지 대기합니다.
+
+        Args:
+            name (str): 우선순위 등급. 누락 시 현재 컨텍스트의 등급(priority 참조)을 사용합니다.
+
+        Returns:
+            str: 자리를 얻은 등급
+        """
+        name = name or _current_priority.get()
+        if name not in self.weights:
+            raise ValueError("알 수 없는 우선순위 등급입니다. ({name})".format(name=name))
+
+        ticket = _Ticket()
+        with self._condition:
+            if not self._waiting[name]:  # 쉬고 있던 등급이 밀린 몫을 한 번에 가져가지 않도록 합니다.
+                self._finish_tags[name] = max(self._finish_tags[name], self._virtual_time)
+            self._waiting[name].append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._condition.wait()
+        return name
+
+    def release(self, name):
+        """acquire로 얻은 자리를 반납합니다.
+
+        Args:
+            name (str): acquire가 반환한 등급
+        """
+        with self._condition:
+            self._in_use[name] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, name=None):
+        name = self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+
+class ScheduledTransport(BaseTransport):
+    """RequestScheduler에서 자리를 얻은 뒤 요청을 보내는 Transport
+
+    Attributes:
+        transport (BaseTransport): 실제 요청을 보낼 Transport
+        scheduler (RequestScheduler): 요청 스케줄러
+    """
+
+    def __init__(self, transport, scheduler):
+        self.transport = transport
+        self.scheduler = scheduler
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        with self.scheduler.slot():
+            return self.transport.request(method, url, params=params, data=data, headers=headers)
+
+    async def arequest(self, method, url, params=None, data=None, headers=None):
+        """request의 coroutine 버전. 자리를 기다리는 동안 이벤트 루프를 막지 않도록 대기는 스레드풀에서 진행합니다."""
+        loop = asyncio.get_running_loop()
+        name = _current_priority.get()
+        acquiring = loop.run_in_executor(None, self.scheduler.acquire, name)
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:  # 취소되더라도 뒤늦게 얻은 자리는 반납합니다.
+            acquiring.add_done_callback(
+                lambda future: future.cancelled() or future.exception() or self.scheduler.release(name))
+            raise
+
+        try:
+            if hasattr(self.transport, 'arequest'):
+                return await self.transport.arequest(method, url, params=params, data=data, headers=headers)
+            return await loop.run_in_executor(
+                None, lambda: self.transport.request(method, url, params=params, data=data, headers=headers))
+        finally:
+            self.scheduler.release(name)
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,220 @@
+"""아임포트 API 로컬 사이드카
+
+같은 호스트의 여러 프로세스가 Unix 소켓으로 요청을 보내면, 사이드카 하나가 인증 토큰, 연결 풀, 조회 캐시, 요청 수 제한을 공유해 아임포트 API로 전달합니다.
+
+    IAMPORTER_IMP_KEY=... IAMPORTER_IMP_SECRET=... iamporter-sidecar --socket /tmp/iamporter-sidecar.sock
+
+클라이언트는 transport만 바꿔 기존 API를 그대로 사용합니다.
+
+    Iamporter(imp_key=..., imp_secret=..., transport=SidecarTransport("/tmp/iamporter-sidecar.sock"))
+"""
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+
+from .base import IamportAuth, build_url
+from .bulk import RateLimiter
+from .consts import IAMPORT_API_URL
+from .transports import (DEFAULT_SIDECAR_PATH, SIDECAR_PROTOCOL_VERSION, STATUS_HEADER, TRANSPORT_ERRORS,
+                         TRANSPORT_URLLIB3, build_transport, read_frame, write_frame)
+
+TOKEN_PATH = "/users/getToken"
+
+# 결제 상태처럼 쓰기 요청이나 외부 이벤트로 바뀌는 응답은 캐시하지 않고, 거의 바뀌지 않는 코드표만 캐시합니다.
+DEFAULT_CACHE_PATHS = ("/banks", "/cards")
+
+
+def _same_secret(value, expected):
+    """value가 expected와 같은지 실행 시간으로 내용이 드러나지 않게 비교합니다."""
+    if not (isinstance(value, str) and isinstance(expected, str)):
+        return False
+    return hmac.compare_digest(value.encode('utf-8'), expected.encode('utf-8'))
+
+
+class _SidecarHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                payload = read_frame(self.rfile)
+            except (OSError, EOFError):
+                return
+            status, body = self.server.dispatch(payload)
+            try:
+                write_frame(self.wfile, STATUS_HEADER.pack(status) + body)
+            except OSError:
+                return
+
+
+class SidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """아임포트 API 사이드카 서버
+    클라이언트의 getToken 요청은 사이드카의 API 키와 같은지만 확인하고 사이드카 전용 토큰을 발급하며, 실제 액세스 토큰은 사이드카만 보관합니다.
+    소켓 파일은 사이드카를 실행한 사용자만 접근할 수 있도록 만들어집니다.
+
+    Attributes:
+        imp_auth (IamportAuth): 아임포트 API 인증 인스턴스
+        transport (BaseTransport): 아임포트 API 호출에 사용될 Transport
+        rate_limiter (RateLimiter): 초당 요청 수 제한. None이면 제한하지 않습니다.
+        cache_ttl (float): GET 응답 캐시 유지 시간(초). 0이면 캐시하지 않습니다.
+        cache_size (int): 최대 캐시 항목 수
+        cache_paths (tuple): 캐시할 GET 요청 경로 접두어
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=DEFAULT_SIDECAR_PATH, imp_key=None, imp_secret=None, imp_url=IAMPORT_API_URL,
+                 transport=TRANSPORT_URLLIB3, rate=None, cache_ttl=0, cache_size=10000, cache_paths=DEFAULT_CACHE_PATHS):
+        """
+        Args:
+            path (str): Unix 소켓 경로. 기본값은 IAMPORTER_SIDECAR_SOCKET 환경변수 또는 /tmp/iamporter-sidecar.sock
+            imp_key (str): Iamport REST API Key
+            imp_secret (str): Iamport REST API Secret
+            imp_url (str): Iamport REST API Host. 기본값은 https://api.iamport.kr/
+            transport (str or BaseTransport): 아임포트 API 호출에 사용할 Transport. 기본값 urllib3
+            rate (float): 초당 최대 요청 수. 누락 시 제한하지 않습니다.
+            cache_ttl (float): GET 응답 캐시 유지 시간(초). 기본값 0 (캐시하지 않음)
+            cache_size (int): 최대 캐시 항목 수. 기본값 10000
+            cache_paths (tuple): 캐시할 GET 요청 경로 접두어. 기본값은 은행/카드사 코드표(/banks, /cards)입니다.
+                결제 조회처럼 상태가 바뀌는 경로를 추가하면 취소 등의 쓰기 요청 후에도 cache_ttl 동안 이전 응답이 반환됩니다.
+        """
+        self.imp_url = imp_url
+        self.transport = build_transport(transport)
+        self.imp_auth = IamportAuth(imp_key, imp_secret, imp_url=imp_url, transport=self.transport)
+        self.rate_limiter = RateLimiter(rate, burst=max(int(rate), 1)) if rate else None
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache_paths = tuple(cache_paths)
+
+        self._credentials = {'imp_key': imp_key, 'imp_secret': imp_secret}
+        self._client_token = secrets.token_hex(16)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        umask = os.umask(0o077)  # 소켓 파일이 만들어지는 순간부터 다른 사용자가 접근할 수 없도록 합니다.
+        try:
+            super().__init__(path, _SidecarHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        self.transport.close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    @staticmethod
+    def _body(code=0, message=None, response=None):
+        return json.dumps({'code': code, 'message': message, 'response': response},
+                          ensure_ascii=False).encode('utf-8')
+
+    def dispatch(self, payload):
+        """클라이언트 요청 하나를 처리합니다.
+
+        Args:
+            payload (bytes): SidecarTransport가 보낸 요청
+
+        Returns:
+            tuple: (HTTP 상태 코드, 응답 본문 bytes)
+        """
+        try:
+            message = json.loads(payload.decode('utf-8'))
+            if len(message) == 5:  # 버전이 없는 처음 형식 (form 요청)
+                message = [0] + message + [None]
+            version, method, path, params, data, token, content_type = message
+        except (ValueError, TypeError):
+            return 400, self._body(-1, "잘못된 사이드카 요청입니다.")
+        if not isinstance(version, int) or version > SIDECAR_PROTOCOL_VERSION:
+            return 400, self._body(-1, "지원하지 않는 사이드카 프로토콜 버전입니다. ({version})".format(version=version))
+
+        if path == TOKEN_PATH:
+            data = data if isinstance(data, dict) else {}
+            matched = [_same_secret(data.get(key), value) for key, value in self._credentials.items()]
+            if not all(matched):
+                return 401, self._body(-1, "사이드카의 API 키와 일치하지 않습니다.")
+            return 200, self._body(response={'access_token': self._client_token})
+        if not _same_secret(token, self._client_token):
+            return 401, self._body(-1, "사이드카에서 발급한 토큰이 아닙니다.")
+
+        cache_key = None
+        if method == 'GET' and self.cache_ttl and path.startswith(self.cache_paths):
+            cache_key = (path, json.dumps(params, sort_keys=True))
+            cached = self._cached(cache_key)
+            if cached is not None:
+                return 200, cached
+
+        try:
+            status, body = self._forward(method, path, params, data, content_type)
+        except TRANSPORT_ERRORS as e:  # 처리 여부를 알 수 없으므로 5xx로 전달해 클라이언트가 판단하게 합니다.
+            return 502, self._body(-1, "아임포트 API 요청에 실패했습니다. ({error})".format(error=e))
+
+        if cache_key is not None and status == 200:
+            self._store(cache_key, body)
+        return status, body
+
+    def _forward(self, method, path, params, data, content_type=None):
+        url = build_url(self.imp_url, path)
+        headers = {}
+        if content_type:
+            data, headers['Content-Type'] = data.encode('utf-8'), content_type
+        for _ in range(2):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            token = headers['Authorization'] = self.imp_auth.token
+            response = self.transport.request(method, url, params=params or None, data=data or None,
+                                              headers=headers)
+            if response.status_code != 401:
+                break
+            self.imp_auth.refresh(token)
+        return response.status_code, response.content
+
+    def _cached(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key, body):
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, body)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="아임포트 API 로컬 사이드카")
+    parser.add_argument('--socket', default=DEFAULT_SIDECAR_PATH)
+    parser.add_argument('--imp-url', default=IAMPORT_API_URL)
+    parser.add_argument('--transport', default=TRANSPORT_URLLIB3)
+    parser.add_argument('--rate', type=float, default=None, help="초당 최대 요청 수")
+    parser.add_argument('--cache-ttl', type=float, default=0, help="코드표(/banks, /cards) 응답 캐시 유지 시간(초)")
+    args = parser.parse_args(argv)
+
+    imp_key, imp_secret = os.environ.get('IAMPORTER_IMP_KEY'), os.environ.get('IAMPORTER_IMP_SECRET')
+    if not (imp_key and imp_secret):
+        parser.error("IAMPORTER_IMP_KEY, IAMPORTER_IMP_SECRET 환경변수를 지정해야합니다.")
+
+    server = SidecarServer(args.socket, imp_key, imp_secret, imp_url=args.imp_url, transport=args.transport,
+                           rate=args.rate, cache_ttl=args.cache_ttl)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
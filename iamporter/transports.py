@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import urllib3
+
+TRANSPORT_REQUESTS = "requests"
+TRANSPORT_URLLIB3 = "urllib3"
+TRANSPORT_ASYNC = "async"
+TRANSPORT_SIDECAR = "sidecar"
+
+# 요청이 서버에서 처리되었는지 알 수 없는 전송 계층 오류
+TRANSPORT_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError, json.JSONDecodeError, UnicodeDecodeError,
+                    OSError)
+
+DEFAULT_SIDECAR_PATH = os.environ.get('IAMPORTER_SIDECAR_SOCKET', "/tmp/iamporter-sidecar.sock")
+
+# 사이드카 요청 형식 버전. 버전이 없는 5개 항목 배열은 form 요청만 지원하던 처음 형식입니다.
+SIDECAR_PROTOCOL_VERSION = 1
+
+_FRAME_HEADER = struct.Struct('>I')
+STATUS_HEADER = struct.Struct('>H')
+
+
+def write_frame(stream, payload):
+    """길이(4바이트 big-endian)를 앞에 붙여 payload를 씁니다."""
+    stream.write(_FRAME_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def read_frame(stream):
+    """write_frame으로 쓴 payload 하나를 읽습니다. 연결이 닫혔으면 EOFError를 발생시킵니다."""
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        raise EOFError()
+    length, = _FRAME_HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise EOFError()
+    return payload
+
+
+class TransportResponse:
+    """requests.Response와 같은 방식으로 사용할 수 있는 최소한의 응답 객체
+
+    Attributes:
+        status_code (int): HTTP 상태 코드
+        content (bytes): 응답 본문
+    """
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class BaseTransport:
+    """HTTP 요청 전송 계층 추상 객체
+    BaseApi와 IamportAuth는 Transport를 통해서만 요청을 보내므로, Transport를 바꾸면 HTTP 라이브러리를 교체할 수 있습니다.
+    """
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        """HTTP 요청을 보냅니다.
+
+        Args:
+            method (str): HTTP Method
+            url (str): 요청 URL
+            params (dict): 쿼리 파라메터. 값이 list이면 같은 key로 여러 번 전달합니다.
+            data (dict or bytes): form 본문. bytes이면 headers의 Content-Type에 맞게 인코딩된 본문을 그대로 보냅니다.
+            headers (dict): 요청 헤더
+
+        Returns:
+            status_code와 json()을 갖는 응답 객체
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(BaseTransport):
+    """requests 라이브러리를 사용하는 기본 Transport
+    requests.Session은 스레드 안전성이 보장되지 않으므로, per_thread를 지정하면 session의 adapter(연결 풀)를 공유하는 스레드별 세션으로 요청합니다.
+
+    Attributes:
+        session (requests.Session): 요청에 사용할 세션. None이면 요청마다 새 연결을 사용합니다.
+        per_thread (bool): 스레드별 세션 사용 여부
+    """
+
+    def __init__(self, session=None, per_thread=False):
+        """
+        Args:
+            session (requests.Session): 요청에 사용할 세션 (iamporter.cassette.Cassette 포함)
+            per_thread (bool): True이면 session의 adapter와 설정을 복사한 스레드별 세션을 사용합니다. 기본값 False
+        """
+        self.session = session
+        self.per_thread = per_thread
+        self._local = threading.local()
+
+    def _session(self):
+        if not (self.per_thread and isinstance(self.session, requests.Session)):
+            return self.session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.adapters = self.session.adapters.copy()  # adapter 객체(연결 풀)는 모든 스레드가 공유합니다.
+            session.headers = self.session.headers.copy()
+            session.auth, session.proxies, session.verify, session.cert = (
+                self.session.auth, self.session.proxies.copy(), self.session.verify, self.session.cert)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        session = self._session()
+        if isinstance(session, requests.Session):
+            return session.request(method, url, params=params, data=data, headers=headers)
+        return requests.request(method, url, params=params, data=data, headers=headers)
+
+    def close(self):
+        if isinstance(self.session, requests.Session):
+            self.session.close()
+
+
+class Urllib3Transport(BaseTransport):
+    """urllib3 연결 풀을 직접 사용하는 Transport
+    requests의 hook, adapter, cookie jar 처리를 거치지 않아 요청당 오버헤드가 작습니다.
+
+    Attributes:
+        pool_manager (urllib3.PoolManager): 요청에 사용할 연결 풀
+    """
+
+    def __init__(self, pool_manager=None, maxsize=10, retries=3, timeout=None):
+        """
+        Args:
+            pool_manager (urllib3.PoolManager): 요청에 사용할 연결 풀. 누락 시 새로 만듭니다.
+            maxsize (int): 호스트별 최대 연결 수. 기본값 10
+            retries (int): 연결 실패 시 재시도 횟수. 기본값 3
+            timeout (float): 요청 타임아웃(초). 누락 시 제한하지 않습니다.
+        """
+        self.pool_manager = pool_manager or urllib3.PoolManager(
+            maxsize=maxsize, retries=urllib3.Retry(total=retries, read=False, redirect=False),
+            timeout=urllib3.Timeout(total=timeout))
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        if params:
+            url = url + "?" + urllib.parse.urlencode(params, doseq=True)
+        body = None
+        headers = dict(headers or {})
+        if isinstance(data, bytes):
+            body = data
+        elif data:
+            body = urllib.parse.urlencode(data, doseq=True)
+            headers['Content-Type'] = "application/x-www-form-urlencoded"
+
+        response = self.pool_manager.request(method, url, body=body, headers=headers)
+        return TransportResponse(response.status, response.data)
+
+    def close(self):
+        self.pool_manager.clear()
+
+
+class AsyncTransport(BaseTransport):
+    """asyncio에서 사용할 수 있는 Transport
+    동기 요청은 내부 Transport로 그대로 보내고, arequest는 내부 Transport를 전용 스레드풀에서 실행해 이벤트 루프를 막지 않습니다.
+
+    Attributes:
+        transport (BaseTransport): 실제 요청을 보낼 Transport
+    """
+
+    def __init__(self, transport=None, max_workers=10):
+        """
+        Args:
+            transport (BaseTransport): 실제 요청을 보낼 Transport. 누락 시 Urllib3Transport를 사용합니다.
+            max_workers (int): 동시에 진행할 최대 요청 수. 기본값 10
+        """
+        self.transport = transport or Urllib3Transport(maxsize=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        return self.transport.request(method, url, params=params, data=data, headers=headers)
+
+    async def arequest(self, method, url, params=None, data=None, headers=None):
+        """request의 coroutine 버전"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: self.transport.request(method, url, params=params, data=data, headers=headers))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.transport.close()
+
+
+class SidecarTransport(BaseTransport):
+    """로컬 사이드카(iamporter-sidecar)에 Unix 소켓으로 요청을 보내는 Transport
+    인증, 연결 풀, 캐시, 요청 수 제한은 사이드카가 담당하므로 같은 호스트의 여러 프로세스가 하나의 토큰과 연결 풀을 공유합니다.
+
+    요청은 [method, path, params, data, token] JSON 배열을, 응답은 HTTP 상태 코드(2바이트)와 응답 본문을 길이 접두 프레임으로 주고받습니다.
+    data가 이미 인코딩된 본문(JSON 등)이면 프로토콜 버전을 앞에 붙인 [1, method, path, params, data, token, content_type] 배열을 보냅니다.
+    form 요청은 처음 형식 그대로 보내므로 이전 버전의 사이드카와도 함께 사용할 수 있습니다.
+
+    Attributes:
+        path (str): 사이드카 Unix 소켓 경로
+        pool_size (int): 유지할 최대 유휴 연결 수
+        timeout (float): 소켓 타임아웃(초)
+    """
+
+    def __init__(self, path=DEFAULT_SIDECAR_PATH, pool_size=10, timeout=None):
+        """
+        Args:
+            path (str): 사이드카 Unix 소켓 경로. 기본값은 IAMPORTER_SIDECAR_SOCKET 환경변수 또는 /tmp/iamporter-sidecar.sock
+            pool_size (int): 유지할 최대 유휴 연결 수. 기본값 10
+            timeout (float): 소켓 타임아웃(초). 누락 시 제한하지 않습니다.
+        """
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock, sock.makefile('rwb')
+
+    @staticmethod
+    def _disconnect(connection):
+        connection[1].close()
+        connection[0].close()
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        headers = headers or {}
+        message = [
+            method, urllib.parse.urlsplit(url).path,
+            {key: value for key, value in (params or {}).items() if value is not None},
+        ]
+        if isinstance(data, bytes):
+            message = [SIDECAR_PROTOCOL_VERSION] + message + [
+                data.decode('utf-8'), headers.get('Authorization'), headers.get('Content-Type')]
+        else:
+            message += [{key: value for key, value in (data or {}).items() if value is not None},
+                        headers.get('Authorization')]
+        payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is not None:
+            try:
+                write_frame(connection[1], payload)
+            except (BrokenPipeError, ConnectionResetError):  # 사이드카가 재시작되어 끊긴 유휴 연결
+                self._disconnect(connection)
+                connection = None
+        if connection is None:
+            connection = self._connect()
+            try:
+                write_frame(connection[1], payload)
+            except OSError:
+                self._disconnect(connection)
+                raise
+
+        try:
+            response = read_frame(connection[1])
+        except (OSError, EOFError) as e:
+            self._disconnect(connection)
+            raise ConnectionError("사이드카 응답을 받지 못했습니다.") from e
+
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                connection = None
+        if connection is not None:
+            self._disconnect(connection)
+
+        status, = STATUS_HEADER.unpack(response[:STATUS_HEADER.size])
+        return TransportResponse(status, response[STATUS_HEADER.size:])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._disconnect(connection)
+
+
+def build_transport(transport=None, session=None, per_thread=False):
+    """Transport 이름 또는 인스턴스로 Transport를 만듭니다.
+
+    Args:
+        transport (str or BaseTransport): requests, urllib3, async, sidecar 중 하나 또는 BaseTransport 인스턴스. 기본값 requests
+        session (requests.Session): requests Transport에 사용할 세션
+        per_thread (bool): requests Transport가 session을 복사한 스레드별 세션을 사용할지 여부. 기본값 False
+
+    Returns:
+        BaseTransport
+    """
+    if isinstance(transport, BaseTransport):
+        return transport
+    if transport in (None, TRANSPORT_REQUESTS):
+        return RequestsTransport(session, per_thread=per_thread)
+    if transport == TRANSPORT_URLLIB3:
+        return Urllib3Transport()
+    if transport == TRANSPORT_ASYNC:
+        return AsyncTransport()
+    if transport == TRANSPORT_SIDECAR:
+        return SidecarTransport()
+    raise ValueError("지원하지 않는 transport입니다. ({transport})".format(transport=transport))
@@ -0,0 +1,244 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .consts import IMP_STATUS_READY, IMP_STATUS_PAID
+from .scheduler import PRIORITY_BACKGROUND, priority
+
+
+class _Watch:
+    __slots__ = ('imp_uid', 'vbank_date', 'interval', 'due_at')
+
+    def __init__(self, imp_uid, vbank_date, interval, due_at):
+        self.imp_uid = imp_uid
+        self.vbank_date = vbank_date
+        self.interval = interval
+        self.due_at = due_at
+
+
+class VBankWatcher:
+    """가상계좌 입금 감시 객체
+    입금대기(ready) 상태인 가상계좌 결제건들을 하나의 우선순위 큐로 관리하며, 조회 시각이 된 건들을 모아 한 번에 조회합니다.
+    입금이 없으면 조회 간격을 두 배씩 늘리되, 입금기한(vbank_date)이 가까워질수록 간격을 다시 좁혀 기한 직전의 입금을 놓치지 않습니다.
+    입금기한이 지난 뒤 마지막으로 한 번 더 조회해도 입금되지 않은 건은 만료로 처리하고 감시 대상에서 제외합니다.
+    웹훅을 받는 경우 notify를 호출하면 해당 건을 즉시 조회합니다.
+
+    Attributes:
+        client (Iamporter): 결제내역 조회에 사용할 클라이언트
+        min_interval (float): 최소 조회 간격(초)
+        max_interval (float): 최대 조회 간격(초)
+        batch_size (int): 한 번에 조회할 최대 결제건수 (최대 100)
+        grace (float): 입금기한 이후 마지막 조회까지 기다리는 시간(초)
+    """
+
+    def __init__(self, client, on_paid=None, on_expired=None, on_closed=None, on_error=None,
+                 min_interval=30, max_interval=3600, batch_size=100, grace=60, webhook=False, clock=time.time):
+        """
+        Args:
+            client (Iamporter): 결제내역 조회에 사용할 클라이언트
+            on_paid (callable): 입금이 확인된 결제건(dict)을 인자로 호출됩니다.
+            on_expired (callable): 입금기한이 지난 결제건(dict)을 인자로 호출됩니다.
+            on_closed (callable): 입금 전에 취소/실패된 결제건(dict)을 인자로 호출됩니다.
+            on_error (callable): run 도중 조회에 실패한 경우 예외를 인자로 호출됩니다.
+            min_interval (float): 최소 조회 간격(초). 기본값 30
+            max_interval (float): 최대 조회 간격(초). 기본값 3600
+            batch_size (int): 한 번에 조회할 최대 결제건수. 기본값 100
+            grace (float): 입금기한 이후 마지막 조회까지 기다리는 시간(초). 기본값 60
+            webhook (bool): 웹훅으로 입금통보를 받는 경우 True. 주기 조회는 max_interval 간격의 안전장치로만 동작합니다.
+            clock (callable): 현재 UNIX TIMESTAMP를 반환하는 함수
+        """
+        self.client = client
+        self.on_paid = on_paid
+        self.on_expired = on_expired
+        self.on_closed = on_closed
+        self.on_error = on_error
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.batch_size = min(batch_size, 100)
+        self.grace = grace
+        self.webhook = webhook
+        self.clock = clock
+
+        self._watches = {}
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._watches)
+
+    def __contains__(self, imp_uid):
+        return imp_uid in self._watches
+
+    def _schedule(self, watch, due_at):
+        watch.due_at = due_at
+        heapq.heappush(self._queue, (due_at, next(self._counter), watch))
+
+    def _next_interval(self, watch, now):
+        interval = min(watch.interval * 2, self.max_interval)
+        remaining = watch.vbank_date - now
+        if remaining > 0:
+            # 입금기한이 가까워질수록 남은 시간의 절반 이내로 간격을 좁힙니다.
+            interval = max(min(interval, remaining / 2), self.min_interval)
+        return interval
+
+    def watch(self, imp_uid, vbank_date):
+        """가상계좌 결제건을 감시 대상에 추가합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+            vbank_date (int): 가상계좌 입금기한 UNIX TIMESTAMP
+        """
+        interval = self.max_interval if self.webhook else self.min_interval
+        with self._condition:
+            watch = _Watch(imp_uid, vbank_date, interval, None)
+            self._watches[imp_uid] = watch
+            self._schedule(watch, min(self.clock() + interval, vbank_date + self.grace))
+            self._condition.notify()
+
+    def watch_payment(self, payment):
+        """create_vbank 또는 find_payment가 반환한 결제건을 감시 대상에 추가합니다.
+
+        Args:
+            payment (dict): 결제 정보
+        """
+        self.watch(payment['imp_uid'], payment['vbank_date'])
+
+    def unwatch(self, imp_uid):
+        """결제건을 감시 대상에서 제외합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+        """
+        with self._condition:
+            self._watches.pop(imp_uid, None)
+
+    def notify(self, imp_uid):
+        """웹훅 등으로 상태 변경이 통보된 결제건을 다음 poll에서 즉시 조회하도록 합니다.
+
+        Args:
+            imp_uid (str): 아임포트 고유번호
+        """
+        with self._condition:
+            watch = self._watches.get(imp_uid)
+            if watch is not None:
+                self._schedule(watch, self.clock())
+                self._condition.notify()
+
+    def next_due(self):
+        """다음 조회 예정 시각을 반환합니다. 감시 중인 결제건이 없으면 None을 반환합니다.
+
+        Returns:
+            float
+        """
+        with self._condition:
+            self._discard_stale()
+            return self._queue[0][0] if self._queue else None
+
+    def _discard_stale(self):
+        while self._queue:
+            due_at, _, watch = self._queue[0]
+            if self._watches.get(watch.imp_uid) is watch and watch.due_at == due_at:
+                return
+            heapq.heappop(self._queue)
+
+    def _pop_due(self, now, checked=()):
+        batch, deferred = [], []
+        with self._condition:
+            while len(batch) < self.batch_size:
+                self._discard_stale()
+                if not self._queue or self._queue[0][0] > now:
+                    break
+                entry = heapq.heappop(self._queue)
+                # 같은 poll에서 이미 조회한 건(조회 도중 notify된 건 등)은 다음 poll로 미룹니다.
+                (deferred if entry[2].imp_uid in checked else batch).append(entry[2])
+            for watch in deferred:
+                heapq.heappush(self._queue, (watch.due_at, next(self._counter), watch))
+        return batch
+
+    def poll(self):
+        """조회 시각이 된 결제건들을 batch_size 단위로 조회하고 상태에 따라 콜백을 호출합니다.
+
+        Returns:
+            int: 조회한 결제건수
+        """
+        now = self.clock()
+        checked = set()
+        batch = self._pop_due(now)
+        while batch:
+            watches = {watch.imp_uid: watch for watch in batch}
+            try:
+                with priority(PRIORITY_BACKGROUND):
+                    payments = self.client.find_payments(list(watches))
+            except Exception:
+                with self._condition:
+                    for watch in batch:
+                        self._schedule(watch, now + self.min_interval)
+                raise
+            checked.update(watches)
+
+            for payment in payments:
+                watch = watches.pop(payment.get('imp_uid'), None)
+                if watch is not None:
+                    self._process(watch, payment, now)
+            for watch in watches.values():  # 응답에 포함되지 않은 건은 다음 주기에 다시 조회합니다.
+                self._reschedule(watch, now)
+
+            batch = self._pop_due(now, checked)
+        return len(checked)
+
+    def _process(self, watch, payment, now):
+        status = payment.get('status')
+        if status == IMP_STATUS_READY:
+            # update_vbank로 입금기한이 연장되었을 수 있으므로 응답의 입금기한을 따릅니다.
+            watch.vbank_date = payment.get('vbank_date') or watch.vbank_date
+            if now >= watch.vbank_date + self.grace:  # 입금기한이 지난 뒤의 조회가 마지막 조회입니다.
+                self._finish(watch, self.on_expired, payment)
+            else:
+                self._reschedule(watch, now)
+        elif status == IMP_STATUS_PAID:
+            self._finish(watch, self.on_paid, payment)
+        else:
+            self._finish(watch, self.on_closed, payment)
+
+    def _reschedule(self, watch, now):
+        with self._condition:
+            if self._watches.get(watch.imp_uid) is not watch:
+                return
+            deadline = watch.vbank_date + self.grace
+            watch.interval = self._next_interval(watch, now)
+            if now >= deadline:  # 기한이 지났지만 응답에 없던 건은 상태를 확인할 때까지 최소 간격으로 다시 조회합니다.
+                self._schedule(watch, now + self.min_interval)
+            elif now + watch.interval >= deadline:
+                self._schedule(watch, deadline)
+            else:
+                self._schedule(watch, now + watch.interval)
+
+    def _finish(self, watch, callback, payment):
+        with self._condition:
+            if self._watches.get(watch.imp_uid) is not watch:
+                return
+            del self._watches[watch.imp_uid]
+        if callback:
+            callback(payment)
+
+    def run(self, stop_event=None):
+        """stop_event가 설정될 때까지 조회 시각에 맞춰 poll을 반복합니다.
+
+        Args:
+            stop_event (threading.Event): 감시를 중단할 때 설정할 이벤트
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+
+            next_due = self.next_due()
+            with self._condition:
+                timeout = self.max_interval if next_due is None else max(next_due - self.clock(), 0)
+                if timeout > 0:
+                    self._condition.wait(min(timeout, 1.0))  # stop_event를 최소 1초마다 확인합니다.
@@ -32,9 +32,12 @@ setup(
         'Operating System :: OS Independent',
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
     ],
 
     keywords=['iamport', 'import', 'payment', 'iamporter'],
@@ -43,7 +46,14 @@ setup(
 
     install_requires=[
         'requests>=2.0.0,<3.0.0',
+        'urllib3>=1.26.0',
     ],
 
-    python_requires='>=3',
+    entry_points={
+        'console_scripts': [
+            'iamporter-sidecar=iamporter.sidecar:main',
+        ],
+    },
+
+    python_requires='>=3.7',
 )
@@ -1,12 +1,249 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
 
 from iamporter import Iamporter, IamportAuth, IamportResponse, errors, consts
 from iamporter.base import BaseApi, build_url
+from iamporter.bulk import BulkReport, BulkRunner, Checkpoint, RateLimiter, is_retryable, read_csv
+from iamporter.cassette import Cassette, FILTERED
+from iamporter.refund import RefundExecutor
+from iamporter.api import Payments, VBanks
+from iamporter.archive import PaymentArchive
+from iamporter.index import MerchantIndex
+from iamporter.scheduler import RequestScheduler, ScheduledTransport, priority
+from iamporter.hedging import HedgePolicy
+from iamporter.codes import CodeTable
+from iamporter.analytics import PaymentAggregate, split_windows
+from iamporter.transports import (AsyncTransport, BaseTransport, RequestsTransport, SidecarTransport,
+                                  TransportResponse, Urllib3Transport)
+from iamporter.sidecar import SidecarServer
+from iamporter.watcher import VBankWatcher
 
 TEST_IMP_KEY = "imp_apikey"
 TEST_IMP_SECRET = "ekKoeW8RyKuT0zgaZsUtXXTLQ4AhPFW3ZGseDA6bkA5lamv9OqDMnxyeB9wqOsuO9W3Mx9YSJ4dTqJ3f"
 
 
+class MockIamportServer:
+    """네트워크 없이 테스트하기 위한 로컬 아임포트 API 목업 서버"""
+    TOKEN = "mock_access_token"
+
+    def __init__(self):
+        self.payments = {}
+        self.customers = {}
+        self.fail_after_commit = set()
+        self.unavailable = {}
+        self.escrows = {}
+        self.receipts = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, code=0, message=None, response=None):
+                body = json.dumps({'code': code, 'message': message, 'response': response}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', "application/json")
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self):
+                url = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8')
+                if self.headers.get('Content-Type') == "application/json":
+                    form = json.loads(body)
+                else:
+                    form = dict(urllib.parse.parse_qsl(body))
+                with server.lock:
+                    server.requests.append((self.command, url.path, form))
+
+                if url.path == "/users/getToken":
+                    if form.get('imp_key') == TEST_IMP_KEY and form.get('imp_secret') == TEST_IMP_SECRET:
+                        return self._reply(200, response={'access_token': server.TOKEN})
+                    return self._reply(401, code=-1, message="unauthorized")
+                if self.headers.get('Authorization') != server.TOKEN:
+                    return self._reply(401, code=-1, message="unauthorized")
+                return server.route(self, self.command, url.path, query, form)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = "http://127.0.0.1:{port}/".format(port=self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def route(self, handler, method, path, query, form):
+        parts = path.strip("/").split("/")
+        if method == "GET" and parts == ["payments"]:
+            return handler._reply(200, response=[self.payments[imp_uid] for imp_uid in query.get('imp_uid[]', [])
+                                                 if imp_uid in self.payments])
+        if method == "GET" and len(parts) == 3 and parts[:2] == ["payments", "status"]:
+            search_from, search_to = int(query.get('from', ["0"])[0]), int(query.get('to', ["0"])[0])
+            payments = [payment for payment in self.payments.values()
+                        if (parts[2] == consts.IMP_STATUS_ALL or payment['status'] == parts[2])
+                        and (not search_from or payment.get('started_at', 0) >= search_from)
+                        and (not search_to or payment.get('started_at', 0) <= search_to)]
+            page, limit = int(query.get('page', ["1"])[0]), int(query.get('limit', ["20"])[0])
+            chunk = payments[(page - 1) * limit:page * limit]
+            return handler._reply(200, response={'total': len(payments), 'previous': page - 1,
+                                                 'next': page + 1 if page * limit < len(payments) else 0,
+                                                 'list': chunk})
+        if method == "GET" and len(parts) >= 3 and parts[:2] == ["payments", "find"]:
+            payments = sorted([payment for payment in self.payments.values() if payment['merchant_uid'] == parts[2]],
+                              key=lambda payment: -payment.get('started_at', 0))
+            if payments:
+                return handler._reply(200, response=payments[0])
+            return handler._reply(404, code=1, message="존재하지 않는 결제정보입니다.")
+        if method == "GET" and len(parts) == 2 and parts[0] == "payments":
+            if parts[1] in self.payments:
+                return handler._reply(200, response=self.payments[parts[1]])
+            return handler._reply(404, code=1, message="존재하지 않는 결제정보입니다.")
+        if method == "POST" and parts == ["payments", "cancel"]:
+            with self.lock:
+                payment = self.payments.get(form.get('imp_uid'))
+                if payment is None:
+                    return handler._reply(200, code=1, message="취소할 결제건이 존재하지 않습니다.")
+                remaining = payment['amount'] - payment['cancel_amount']
+                if 'checksum' in form and float(form['checksum']) != remaining:
+                    return handler._reply(200, code=1, message="checksum mismatch")
+                amount = float(form.get('amount') or remaining)
+                if amount > remaining:
+                    return handler._reply(200, code=1, message="취소 가능 잔액 초과")
+                payment['cancel_amount'] += amount
+                if payment['cancel_amount'] == payment['amount']:
+                    payment['status'] = consts.IMP_STATUS_CANCELED
+                return handler._reply(200, response=dict(payment))
+        if method == "GET" and parts == ["banks"]:
+            return handler._reply(200, response=[{'code': "004", 'name': "국민은행"}, {'code': "999", 'name': "테스트은행"}])
+        if method == "POST" and len(parts) == 3 and parts[:2] == ["subscribe", "payments"]:
+            if parts[2] == "onetime" and not self.valid_card(form.get('card_number')):
+                return handler._reply(200, code=-1, message="유효하지않은 카드번호를 입력하셨습니다.")
+            if parts[2] == "again" and form.get('customer_uid') not in self.customers:
+                return handler._reply(200, code=1, message="등록되지 않은 구매자입니다.")
+            return handler._reply(200, response=self.create_payment(form, consts.IMP_STATUS_PAID))
+        if len(parts) == 2 and parts[0] == "receipts":
+            imp_uid = parts[1]
+            with self.lock:
+                if imp_uid not in self.payments:
+                    return handler._reply(404, code=1, message="존재하지 않는 결제정보입니다.")
+                receipt = self.receipts.get(imp_uid)
+                if method == "POST":
+                    if receipt is not None:
+                        return handler._reply(400, code=1, message="이미 현금영수증이 발행되었습니다.")
+                    receipt = self.receipts[imp_uid] = {'imp_uid': imp_uid, 'identifier': form.get('identifier'),
+                                                        'receipt_type': form.get('type', "person"),
+                                                        'amount': self.payments[imp_uid]['amount']}
+                elif receipt is None:
+                    return handler._reply(404, code=1, message="발행된 현금영수증이 없습니다.")
+                elif method == "DELETE":
+                    del self.receipts[imp_uid]
+                return handler._reply(200, response=dict(receipt))
+        if method == "POST" and parts == ["vbanks"]:
+            return handler._reply(200, response=self.create_payment(
+                form, consts.IMP_STATUS_READY, pay_method="vbank", vbank_code=form.get('vbank_code'),
+                vbank_date=int(form['vbank_due']), vbank_holder=form.get('vbank_holder')))
+        if method == "GET" and parts == ["vbanks", "holder"]:
+            if not (query.get('bank_code') and query.get('bank_num')):
+                return handler._reply(400, code=1, message="은행코드와 계좌번호가 필요합니다.")
+            return handler._reply(200, response={'bank_holder': "홍길동"})
+        if method in ("PUT", "DELETE") and len(parts) == 2 and parts[0] == "vbanks":
+            with self.lock:
+                payment = self.payments.get(parts[1])
+                if payment is None or payment['status'] != consts.IMP_STATUS_READY:
+                    return handler._reply(400, code=1, message="입금대기 상태의 가상계좌가 아닙니다.")
+                if method == "DELETE":
+                    payment['status'] = consts.IMP_STATUS_CANCELED
+                else:
+                    payment['amount'] = float(form.get('amount', payment['amount']))
+                    payment['vbank_date'] = int(form.get('vbank_due', payment['vbank_date']))
+                return handler._reply(200, response=dict(payment))
+        if len(parts) == 3 and parts[:2] == ["subscribe", "customers"]:
+            customer_uid = parts[2]
+            if method == "POST":
+                with self.lock:
+                    if self.unavailable.get(customer_uid):
+                        self.unavailable[customer_uid] -= 1
+                        return handler._reply(503, code=-1, message="service unavailable")
+                if not self.valid_card(form.get('card_number')):
+                    return handler._reply(200, code=-1, message="유효하지않은 카드번호를 입력하셨습니다.")
+                with self.lock:
+                    digits = form['card_number'].replace("-", "")
+                    self.customers[customer_uid] = {'customer_uid': customer_uid,
+                                                    'customer_name': form.get('customer_name'),
+                                                    'card_number': digits[:6] + "*" * (len(digits) - 10) + digits[-4:]}
+                if customer_uid in self.fail_after_commit:
+                    return handler._reply(502, code=-1, message="bad gateway")
+                return handler._reply(200, response=self.customers[customer_uid])
+            with self.lock:
+                customer = self.customers.get(customer_uid)
+                if customer is not None and method == "DELETE":
+                    del self.customers[customer_uid]
+            if customer is None:
+                return handler._reply(404, code=1, message="요청하신 customer_uid({uid})로 등록된 정보를 찾을 수 없습니다."
+                                      .format(uid=customer_uid))
+            return handler._reply(200, response=customer)
+        if len(parts) == 3 and parts[:2] == ["escrows", "logis"]:
+            imp_uid = parts[2]
+            with self.lock:
+                if self.unavailable.get(imp_uid):
+                    self.unavailable[imp_uid] -= 1
+                    return handler._reply(503, code=-1, message="service unavailable")
+                if not (form.get('logis') or {}).get('invoice'):
+                    return handler._reply(400, code=1, message="송장번호가 필요합니다.")
+                if method == "POST" and imp_uid in self.escrows:
+                    return handler._reply(400, code=1, message="이미 배송정보가 등록되어 있습니다.")
+                if method == "PUT" and imp_uid not in self.escrows:
+                    return handler._reply(404, code=1, message="등록된 배송정보가 없습니다.")
+                self.escrows[imp_uid] = dict(form['logis'], applied_at=int(time.time()))
+            if method == "POST" and imp_uid in self.fail_after_commit:
+                return handler._reply(502, code=-1, message="bad gateway")
+            return handler._reply(200, response=self.escrows[imp_uid])
+        return handler._reply(404, code=1, message="not found")
+
+    def create_payment(self, form, status, **fields):
+        with self.lock:
+            imp_uid = "imp_{count}".format(count=len(self.payments) + 1)
+            self.payments[imp_uid] = dict({'imp_uid': imp_uid, 'merchant_uid': form.get('merchant_uid'),
+                                           'amount': float(form.get('amount')), 'cancel_amount': 0,
+                                           'status': status, 'started_at': int(time.time())}, **fields)
+            return dict(self.payments[imp_uid])
+
+    @staticmethod
+    def valid_card(card_number):
+        """Luhn 검사를 통과하는 카드번호만 유효한 것으로 봅니다."""
+        digits = (card_number or "").replace("-", "")
+        if not digits.isdigit():
+            return False
+        total = 0
+        for i, digit in enumerate(reversed(digits)):
+            digit = int(digit) * (2 if i % 2 else 1)
+            total += digit - 9 if digit > 9 else digit
+        return total % 10 == 0
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
 class TestUrlBuilder(unittest.TestCase):
     def test_build_url(self):
         self.assertEqual(build_url("https://www.test.com", "not_slashed/path"),
@@ -53,13 +290,26 @@ class TestIamportResponse(unittest.TestCase):
 
 
 class TestIamportAuth(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+
     def test_invalid_auth(self):
-        self.assertRaises(errors.ImpUnAuthorized, IamportAuth, "invalid_key", "invalid_secret")
+        self.assertRaises(errors.ImpUnAuthorized, IamportAuth, "invalid_key", "invalid_secret", imp_url=self.server.url)
 
     def test_valid_auth(self):
-        auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET)
+        auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, imp_url=self.server.url)
         self.assertTrue(auth.token)
 
+    def test_keeps_caller_session(self):
+        session = requests.Session()
+        auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, session=session, imp_url=self.server.url)
+        self.assertIs(auth._transport.session, session)
+        self.assertEqual(auth.refresh(), MockIamportServer.TOKEN)
+        session.close()
+
+    def tearDown(self):
+        self.server.__exit__()
+
 
 class TestBaseApi(unittest.TestCase):
     def setUp(self):
@@ -83,14 +333,979 @@ class TestBaseApi(unittest.TestCase):
         self.assertIn('valid_param2', built_params.keys())
 
 
+class TestBulkRunner(unittest.TestCase):
+    def test_run(self):
+        def func(item):
+            if item % 3 == 0:
+                raise ValueError(item)
+            return item * 2
+
+        results = {result.key: result for result in BulkRunner(func, max_workers=3).run(range(10))}
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results['4'].data, 8)
+        self.assertTrue(results['4'].is_succeed)
+        self.assertFalse(results['6'].is_succeed)
+        self.assertIsInstance(results['6'].error, ValueError)
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def func(item):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+
+        list(BulkRunner(func, max_workers=2).run(range(10)))
+        self.assertLessEqual(state['peak'], 2)
+
+    def test_checkpoint_resume(self):
+        path = os.path.join(tempfile.mkdtemp(), "checkpoint.jsonl")
+        calls = []
+
+        def flaky(item):
+            calls.append(item)
+            if item == "b" and calls.count("b") == 1:
+                raise ValueError(item)
+            return item
+
+        first = list(BulkRunner(flaky, checkpoint=path).run(["a", "b", "c"]))
+        self.assertEqual(sum(result.is_succeed for result in first), 2)
+
+        second = list(BulkRunner(flaky, checkpoint=path).run(["a", "b", "c"]))
+        self.assertEqual([result.key for result in second], ["b"])
+        self.assertTrue(second[0].is_succeed)
+
+        checkpoint = Checkpoint(path)
+        self.assertIn("a", checkpoint)
+        self.assertIn("b", checkpoint)
+        checkpoint.close()
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(50)
+        started_at = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.09)
+
+
+class TestVBankWatcher(unittest.TestCase):
+    def setUp(self):
+        class MockClient:
+            def __init__(self):
+                self.statuses = {}
+                self.calls = []
+
+            def find_payments(self, imp_uids):
+                self.calls.append(list(imp_uids))
+                return [{'imp_uid': imp_uid, 'status': self.statuses[imp_uid], 'vbank_date': 1000}
+                        for imp_uid in imp_uids if imp_uid in self.statuses]
+
+        self.now = 0
+        self.client = MockClient()
+        self.paid, self.expired = [], []
+        self.watcher = VBankWatcher(self.client, on_paid=self.paid.append, on_expired=self.expired.append,
+                                    min_interval=10, max_interval=100, grace=5, clock=lambda: self.now)
+
+    def test_batch_lookup(self):
+        for i in range(3):
+            self.client.statuses['imp_%d' % i] = consts.IMP_STATUS_READY
+            self.watcher.watch('imp_%d' % i, 1000)
+
+        self.assertEqual(self.watcher.poll(), 0)
+        self.now = 10
+        self.assertEqual(self.watcher.poll(), 3)
+        self.assertEqual(len(self.client.calls), 1)
+
+        self.client.statuses['imp_1'] = consts.IMP_STATUS_PAID
+        self.now = 30
+        self.watcher.poll()
+        self.assertEqual([payment['imp_uid'] for payment in self.paid], ['imp_1'])
+        self.assertNotIn('imp_1', self.watcher)
+        self.assertEqual(len(self.watcher), 2)
+
+    def test_backoff_and_expire(self):
+        self.client.statuses['imp'] = consts.IMP_STATUS_READY
+        self.watcher.watch('imp', 1000)
+
+        due_times = []
+        while 'imp' in self.watcher:
+            self.now = self.watcher.next_due()
+            due_times.append(self.now)
+            self.watcher.poll()
+
+        intervals = [b - a for a, b in zip(due_times, due_times[1:])]
+        self.assertLessEqual(max(intervals), 100)
+        self.assertEqual(due_times[-1], 1005)
+        self.assertLess(intervals[-2], 100)
+        self.assertEqual(len(self.expired), 1)
+
+    def test_overdue_single_lookup(self):
+        self.watcher.watch('imp_x', 900)  # 응답에 포함되지 않는 건
+        self.client.statuses['imp'] = consts.IMP_STATUS_READY
+        self.watcher.watch('imp', 1000)
+        self.now = 2000
+        self.assertEqual(self.watcher.poll(), 2)
+        self.assertEqual(self.client.calls, [['imp_x', 'imp']])
+        self.assertEqual(len(self.expired), 1)
+        self.assertIn('imp_x', self.watcher)
+        self.assertEqual(self.watcher.next_due(), 2010)
+
+    def test_notify(self):
+        self.client.statuses['imp'] = consts.IMP_STATUS_READY
+        self.watcher.watch('imp', 1000)
+        self.client.statuses['imp'] = consts.IMP_STATUS_PAID
+        self.now = 1
+        self.watcher.notify('imp')
+        self.watcher.poll()
+        self.assertEqual(len(self.paid), 1)
+
+
+class TestReceipts(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        for i in range(3):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i, 'amount': 1000,
+                                                  'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+        self.directory = tempfile.mkdtemp()
+
+    def test_issue_and_cancel(self):
+        self.assertRaises(KeyError, self.client.issue_receipt, imp_uid='imp_0')
+        self.assertRaises(KeyError, self.client.cancel_receipt)
+
+        receipt = self.client.issue_receipt(imp_uid='imp_0', identifier="01012345678", identifier_type="phone",
+                                            receipt_type="company")
+        self.assertEqual(receipt['receipt_type'], "company")
+        self.assertIn('imp_0', self.server.receipts)
+        self.assertRaises(errors.ImpApiError, self.client.issue_receipt, imp_uid='imp_0', identifier="01012345678")
+
+        self.assertEqual(self.client.cancel_receipt(imp_uid='imp_0')['imp_uid'], 'imp_0')
+        self.assertNotIn('imp_0', self.server.receipts)
+        self.assertRaises(errors.ImpApiError, self.client.cancel_receipt, imp_uid='imp_0')
+
+    def test_bulk_issue_and_cancel(self):
+        receipts = [{'imp_uid': imp_uid, 'identifier': "01012345678"} for imp_uid in ('imp_0', 'imp_1', 'nothing')]
+        results = {result.key: result for result in self.client.issue_receipts(receipts)}
+        self.assertTrue(results['imp_0'].is_succeed)
+        self.assertTrue(results['imp_1'].is_succeed)
+        self.assertFalse(results['nothing'].is_succeed)
+        self.assertIsInstance(results['nothing'].error, errors.ImpApiError)
+        self.assertEqual(sorted(self.server.receipts), ['imp_0', 'imp_1'])
+
+        results = {result.key: result for result in self.client.cancel_receipts(['imp_0', 'imp_2'])}
+        self.assertTrue(results['imp_0'].is_succeed)
+        self.assertFalse(results['imp_2'].is_succeed)
+        self.assertEqual(list(self.server.receipts), ['imp_1'])
+
+    def test_checkpoint_resume(self):
+        checkpoint = os.path.join(self.directory, "receipts.jsonl")
+        receipts = [{'imp_uid': imp_uid, 'identifier': "01012345678"} for imp_uid in ('imp_0', 'imp_1', 'imp_9')]
+        self.assertEqual(len(list(self.client.issue_receipts(receipts, checkpoint=checkpoint))), 3)
+
+        self.server.payments['imp_9'] = {'imp_uid': 'imp_9', 'merchant_uid': 'm_9', 'amount': 1000,
+                                         'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        retried = list(self.client.issue_receipts(receipts, checkpoint=checkpoint))
+        self.assertEqual([(result.key, result.is_succeed) for result in retried], [('imp_9', True)])
+
+        cancel_checkpoint = os.path.join(self.directory, "cancels.jsonl")
+        self.assertEqual(len(list(self.client.cancel_receipts(['imp_0'], checkpoint=cancel_checkpoint))), 1)
+        retried = list(self.client.cancel_receipts(['imp_0', 'imp_1'], checkpoint=cancel_checkpoint))
+        self.assertEqual([(result.key, result.is_succeed) for result in retried], [('imp_1', True)])
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__()
+
+
+class TestVBanks(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+
+    def test_create_update_delete(self):
+        payment = self.client.create_vbank(merchant_uid='m_1', amount=1000, vbank_code="004", vbank_due=2000,
+                                           vbank_holder="아임포트", buyer_info={'name': "홍길동"})
+        self.assertEqual(payment['status'], consts.IMP_STATUS_READY)
+        self.assertEqual(payment['vbank_date'], 2000)
+        created = [form for method, path, form in self.server.requests if path == "/vbanks"][0]
+        self.assertEqual(created['buyer_name'], "홍길동")
+
+        self.assertEqual(self.client.update_vbank(imp_uid=payment['imp_uid'], amount=2000)['amount'], 2000)
+        self.assertEqual(self.client.update_vbank(imp_uid=payment['imp_uid'], vbank_due=3000)['vbank_date'], 3000)
+        self.assertEqual(self.client.delete_vbank(imp_uid=payment['imp_uid'])['status'], consts.IMP_STATUS_CANCELED)
+        self.assertRaises(errors.ImpApiError, self.client.delete_vbank, imp_uid=payment['imp_uid'])
+
+    def test_required_params(self):
+        self.assertRaises(KeyError, self.client.create_vbank, merchant_uid='m_1', amount=1000, vbank_code="004",
+                          vbank_due=2000)
+        self.assertRaises(KeyError, self.client.update_vbank, amount=1000)
+        self.assertRaises(KeyError, self.client.update_vbank, imp_uid='imp_1')
+        self.assertRaises(KeyError, self.client.delete_vbank)
+        self.assertFalse([path for _, path, _ in self.server.requests if path.startswith("/vbanks")])
+
+    def test_get_holder(self):
+        api_instance = VBanks(self.client.imp_auth, imp_url=self.server.url)
+        response = api_instance.get_holder("004", "123-456-789")
+        self.assertTrue(response.is_succeed)
+        self.assertEqual(response.data['bank_holder'], "홍길동")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__()
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "cassette.json.gz")
+
+    def test_record_and_replay(self):
+        with MockIamportServer() as server:
+            server.payments['imp_1'] = {'imp_uid': 'imp_1', 'merchant_uid': 'm_1', 'amount': 1000,
+                                        'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID,
+                                        'card_number': "1234-****-****-5678"}
+            recorder = Cassette(self.path, mode="record")
+            client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=server.url, session=recorder)
+            recorded = client.find_payment(imp_uid='imp_1')
+            self.assertRaises(errors.ImpApiError, client.find_payment, imp_uid='nothing')
+            recorder.close()
+
+        player = Cassette(self.path, latency=0.01)
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url="https://unreachable.invalid/",
+                           session=player)
+        replayed = client.find_payment(imp_uid='imp_1')
+        self.assertEqual(replayed['merchant_uid'], recorded['merchant_uid'])
+        self.assertEqual(replayed['card_number'], FILTERED)
+        self.assertEqual(client.find_payment(imp_uid='imp_1')['amount'], 1000)
+        self.assertRaises(errors.ImpApiError, client.find_payment, imp_uid='nothing')
+        self.assertRaises(errors.ImpCassetteMiss, client.find_payment, imp_uid='unrecorded')
+
+    def test_scrub_secrets(self):
+        with MockIamportServer() as server:
+            recorder = Cassette(self.path, mode="record")
+            IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, session=recorder, imp_url=server.url)
+            self.assertFalse(os.path.exists(self.path))  # 전달한 Cassette는 닫히지 않아 아직 저장되지 않습니다.
+            recorder.close()
+
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            content = f.read()
+        self.assertNotIn(TEST_IMP_SECRET, content)
+        self.assertNotIn(MockIamportServer.TOKEN, content)
+
+
+class TestRefundExecutor(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        for i in range(3):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i, 'amount': 1000,
+                                                  'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+
+    def test_serialized_partial_refunds(self):
+        refunds = [{'imp_uid': 'imp_%d' % (i % 3), 'amount': 100, 'reason': "부분환불"} for i in range(15)]
+        with RefundExecutor(self.client, max_workers=3) as executor:
+            results = list(executor.run(refunds))
+
+        self.assertTrue(all(result.is_succeed for result in results))
+        for payment in self.server.payments.values():
+            self.assertEqual(payment['cancel_amount'], 500)
+
+        lookups = [path for method, path, _ in self.server.requests
+                   if method == "GET" and path.startswith("/payments/")]
+        self.assertEqual(sorted(lookups), ['/payments/imp_0', '/payments/imp_1', '/payments/imp_2'])
+        cancels = [form for method, path, form in self.server.requests if path == "/payments/cancel"]
+        self.assertTrue(all('checksum' in form for form in cancels))
+
+    def test_over_refund(self):
+        with RefundExecutor(self.client) as executor:
+            futures = [executor.submit(imp_uid='imp_0', amount=600) for _ in range(2)]
+            self.assertEqual(futures[0].result()['cancel_amount'], 600)
+            self.assertRaises(ValueError, futures[1].result)
+        self.assertEqual(self.server.payments['imp_0']['cancel_amount'], 600)
+
+    def tearDown(self):
+        self.server.__exit__()
+
+
+class TestBillkeyImport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+        self.directory = tempfile.mkdtemp()
+
+    def test_import_from_csv(self):
+        path = os.path.join(self.directory, "cards.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("customer_uid,card_number,expiry,birth,pwd_2digit,customer_name\n")
+            f.write("c_1,4111-1111-1111-1111,2030-01,900101,12,홍길동\n")
+            f.write("c_2,invalid,2030-01,900101,,\n")
+            f.write("c_3,5555-5555-5555-4444,2030-01,900101,12,\n")
+        self.server.fail_after_commit.add("c_3")
+
+        checkpoint = os.path.join(self.directory, "checkpoint.jsonl")
+        results = {result.key: result for result in self.client.create_billkeys(read_csv(path), checkpoint=checkpoint)}
+        self.assertTrue(results['c_1'].is_succeed)
+        self.assertEqual(results['c_1'].data['customer_name'], "홍길동")
+        self.assertFalse(results['c_2'].is_succeed)
+        self.assertTrue(results['c_3'].is_succeed)  # 502 응답이었지만 조회로 발급이 확인된 건
+        self.assertEqual(results['c_3'].data['card_number'], "555555******4444")
+
+        retried = list(self.client.create_billkeys(read_csv(path), checkpoint=checkpoint))
+        self.assertEqual([result.key for result in retried], ['c_2'])
+
+    def test_lookup_rate_limited(self):
+        cards = [{'customer_uid': uid, 'card_number': "4111-1111-1111-1111", 'expiry': "2030-01", 'birth': "900101"}
+                 for uid in ("c_1", "c_2")]
+        self.server.fail_after_commit.update(["c_1", "c_2"])
+        started_at = time.monotonic()
+        results = list(self.client.create_billkeys(cards, max_workers=1, rate=20))
+        self.assertTrue(all(result.is_succeed for result in results))
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.14)  # 발급 요청 2건과 확인 조회 2건 모두 제한됩니다.
+
+    def test_unconfirmed_other_card(self):
+        self.server.customers['c_1'] = {'customer_uid': "c_1", 'card_number': "555555******4444"}
+        self.server.unavailable['c_1'] = 1
+        card = {'customer_uid': "c_1", 'card_number': "4111-1111-1111-1111", 'expiry': "2030-01", 'birth': "900101"}
+        result, = self.client.create_billkeys([card])
+        self.assertFalse(result.is_succeed)  # 이전부터 등록된 다른 카드의 빌링키는 발급 성공으로 보지 않습니다.
+        self.assertTrue(is_retryable(result.error))
+
+    def test_scrub_card(self):
+        card = {'customer_uid': "c_1", 'card_number': "4111-1111-1111-1111", 'expiry': "2030-01", 'birth': "900101"}
+        list(self.client.create_billkeys([card]))
+        self.assertEqual(card, {'customer_uid': "c_1"})
+
+    def tearDown(self):
+        self.server.__exit__()
+
+
+class TestTransports(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.server.payments['imp_1'] = {'imp_uid': 'imp_1', 'merchant_uid': 'm_1', 'amount': 1000,
+                                         'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+
+    def test_backends(self):
+        for i, transport in enumerate(("requests", "urllib3", "async", Urllib3Transport(maxsize=2))):
+            client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url,
+                               transport=transport)
+            self.assertEqual(client.find_payment(imp_uid='imp_1')['merchant_uid'], 'm_1')
+            self.assertEqual(client.find_payments(imp_uids=['imp_1', 'nothing'])[0]['imp_uid'], 'imp_1')
+            self.assertRaises(errors.ImpApiError, client.find_payment, imp_uid='nothing')
+            self.assertEqual(client.cancel_payment(imp_uid='imp_1', amount=10)['cancel_amount'], 10 * (i + 1))
+            self.assertEqual(client.requests_session is not None, transport == "requests")
+            client.close()
+
+        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key="invalid_key", imp_secret="invalid_secret",
+                          imp_url=self.server.url, transport="urllib3")
+        self.assertRaises(ValueError, Iamporter, imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET,
+                          imp_url=self.server.url, transport="unknown")
+
+    def test_transport_errors(self):
+        self.assertTrue(is_retryable(json.JSONDecodeError("", "", 0)))
+        self.assertTrue(is_retryable(requests.ConnectionError()))
+        self.assertFalse(is_retryable(ValueError()))
+
+    def test_async(self):
+        transport = AsyncTransport()
+        auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, imp_url=self.server.url, transport=transport)
+        api_instance = Payments(auth, imp_url=self.server.url, transport=transport)
+
+        async def fetch():
+            return await asyncio.gather(*[api_instance.arequest('GET', '/imp_1') for _ in range(5)])
+
+        responses = asyncio.run(fetch())
+        self.assertTrue(all(response.data['merchant_uid'] == 'm_1' for response in responses))
+        transport.close()
+
+    def test_default_transport(self):
+        api_instance = Payments(None, imp_url=self.server.url)
+        self.assertIsInstance(api_instance.transport, RequestsTransport)
+        self.assertEqual(api_instance.get('imp_1').status, 401)
+
+    def tearDown(self):
+        self.server.__exit__()
+
+
+class TestPaymentArchive(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        now = time.time()
+        for i in range(5):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i, 'amount': 1000,
+                                                  'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID,
+                                                  'started_at': int(now) - 100 + i,
+                                                  'paid_at': int(now) - (400 * 86400 if i < 2 else 10)}
+        self.server.payments['imp_4']['status'] = consts.IMP_STATUS_CANCELED
+        self.archive = PaymentArchive(os.path.join(tempfile.mkdtemp(), "archive.sqlite3"))
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url,
+                                archive=self.archive)
+
+    def _api_calls(self):
+        return len([path for method, path, _ in self.server.requests if path != "/users/getToken"])
+
+    def test_fill_from_scan(self):
+        self.assertEqual(len(list(self.client.scan_payments(limit=2))), 5)
+        self.assertEqual(self._api_calls(), 3)
+        self.assertEqual(len(self.archive), 3)
+        self.assertIn('imp_0', self.archive)
+        self.assertNotIn('imp_2', self.archive)
+
+        calls = self._api_calls()
+        self.assertEqual(self.client.find_payment(imp_uid='imp_1')['merchant_uid'], 'm_1')
+        self.assertEqual(len(self.client.find_payments(imp_uids=['imp_0', 'imp_4'])), 2)
+        self.assertEqual(self._api_calls(), calls)
+
+        self.client.find_payment(imp_uid='imp_2')
+        self.assertEqual(self._api_calls(), calls + 1)
+
+        payments = self.client.find_payments(imp_uids=['imp_3', 'imp_0', 'imp_2', 'imp_4'])
+        self.assertEqual([payment['imp_uid'] for payment in payments], ['imp_3', 'imp_0', 'imp_2', 'imp_4'])
+        self.assertEqual(self.server.requests[-1][1], "/payments")
+
+        self.assertEqual([payment['imp_uid'] for payment in self.archive.query(consts.IMP_STATUS_PAID)],
+                         ['imp_0', 'imp_1'])
+
+    def test_merchant_uid_not_short_circuited(self):
+        self.client.find_payment(imp_uid='imp_4')
+        self.assertIn('imp_4', self.archive)
+        self.server.payments['imp_new'] = dict(self.server.payments['imp_2'], imp_uid='imp_new', merchant_uid='m_4',
+                                               started_at=int(time.time()))
+        self.assertEqual(self.client.find_payment(merchant_uid='m_4')['imp_uid'], 'imp_new')
+        self.assertEqual(self.archive.find('m_4')[0]['imp_uid'], 'imp_4')
+
+    def test_fill_from_find(self):
+        self.client.cancel_payment(imp_uid='imp_3')
+        self.assertIn('imp_3', self.archive)
+        self.assertEqual(self.archive.find('m_3')[0]['status'], consts.IMP_STATUS_CANCELED)
+
+    def tearDown(self):
+        self.archive.close()
+        self.server.__exit__()
+
+
+class TestMerchantIndex(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        for i in range(3):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i, 'amount': 1000,
+                                                  'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID,
+                                                  'started_at': 100 + i}
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url,
+                                merchant_index_size=10000)
+
+    def _paths(self):
+        return [path for method, path, _ in self.server.requests if path != "/users/getToken"]
+
+    def test_learn_and_resolve(self):
+        list(self.client.scan_payments())
+        self.assertEqual(self.client.find_payment(merchant_uid='m_1')['imp_uid'], 'imp_1')
+        self.assertEqual(self._paths()[-1], "/payments/imp_1")
+
+        self.client.learn_webhook({'imp_uid': 'imp_9', 'merchant_uid': 'm_9', 'status': "paid"})
+        self.assertEqual(self.client.merchant_index.get('m_9'), 'imp_9')
+        self.assertRaises(errors.ImpApiError, self.client.find_payment, merchant_uid='m_9')
+        self.assertEqual(self._paths()[-2:], ["/payments/imp_9", "/payments/find/m_9"])
+        self.assertNotIn('m_9', self.client.merchant_index)
+
+    def test_miss_falls_back(self):
+        self.assertEqual(self.client.find_payment(merchant_uid='m_2')['imp_uid'], 'imp_2')
+        self.assertEqual(self._paths(), ["/payments/find/m_2"])
+        self.client.find_payment(merchant_uid='m_2')
+        self.assertEqual(self._paths()[-1], "/payments/imp_2")
+
+    def test_bounded(self):
+        index = MerchantIndex(maxsize=2)
+        index.learn({'imp_uid': 'imp_0', 'merchant_uid': 'm_0', 'started_at': 10})
+        index.learn({'imp_uid': 'imp_1', 'merchant_uid': 'm_1'})
+        index.get('m_0')
+        index.learn({'imp_uid': 'imp_2', 'merchant_uid': 'm_2'})
+        self.assertNotIn('m_1', index)
+        self.assertEqual(len(index), 2)
+
+        index.learn({'imp_uid': 'imp_old', 'merchant_uid': 'm_0', 'started_at': 5})
+        self.assertEqual(index.get('m_0'), 'imp_0')
+        index.learn({'imp_uid': 'imp_unknown', 'merchant_uid': 'm_0'})
+        self.assertEqual(index.get('m_0'), 'imp_0')
+        index.learn({'imp_uid': 'imp_new', 'merchant_uid': 'm_0', 'started_at': 20})
+        self.assertEqual(index.get('m_0'), 'imp_new')
+
+    def test_disabled_by_default(self):
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+        self.assertIsNone(client.merchant_index)
+        client.find_payment(merchant_uid='m_1')
+        client.find_payment(merchant_uid='m_1')
+        self.assertEqual(self._paths(), ["/payments/find/m_1", "/payments/find/m_1"])
+
+    def tearDown(self):
+        self.server.__exit__()
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def _hold(self, scheduler, name, release_event, acquired):
+        def work():
+            with scheduler.slot(name):
+                acquired.append(name)
+                release_event.wait()
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        return thread
+
+    def test_reservation(self):
+        scheduler = RequestScheduler(capacity=3, reservations={'interactive': 1, 'background': 0})
+        release, acquired = threading.Event(), []
+        threads = [self._hold(scheduler, 'background', release, acquired) for _ in range(4)]
+        time.sleep(0.1)
+        self.assertEqual(scheduler.in_use('background'), 2)
+
+        threads.append(self._hold(scheduler, 'interactive', release, acquired))
+        time.sleep(0.1)
+        self.assertEqual(scheduler.in_use('interactive'), 1)
+        self.assertEqual(scheduler.in_use(), 3)
+
+        release.set()
+        for thread in threads:
+            thread.join(1)
+        self.assertEqual(scheduler.in_use(), 0)
+
+    def test_weighted_order(self):
+        scheduler = RequestScheduler(capacity=1, weights={'interactive': 3, 'background': 1},
+                                     reservations={'interactive': 0, 'background': 0})
+        order, threads = [], []
+
+        def work(name):
+            with scheduler.slot(name):
+                order.append(name)
+
+        holder = scheduler.acquire('background')
+        for name in ['background'] * 4 + ['interactive'] * 8:
+            threads.append(threading.Thread(target=work, args=(name,), daemon=True))
+            threads[-1].start()
+        while sum(len(queue) for queue in scheduler._waiting.values()) < 12:
+            time.sleep(0.01)
+        scheduler.release(holder)
+        for thread in threads:
+            thread.join(1)
+
+        self.assertEqual(len(order), 12)
+        self.assertGreaterEqual(order[:8].count('interactive'), 6)
+        self.assertIn('background', order[:8])  # 가중치가 낮아도 굶지 않습니다.
+
+    def test_scheduled_transport(self):
+        class RecordingTransport:
+            def __init__(self):
+                self.seen = []
+
+            def request(self, method, url, **kwargs):
+                self.seen.append(scheduler.in_use('background'))
+
+        scheduler = RequestScheduler()
+        inner = RecordingTransport()
+        transport = ScheduledTransport(inner, scheduler)
+        transport.request('GET', "http://localhost/")
+        with priority('background'):
+            transport.request('GET', "http://localhost/")
+        self.assertEqual(inner.seen, [0, 1])
+        self.assertRaises(ValueError, scheduler.acquire, 'unknown')
+
+    def test_scheduled_async_transport(self):
+        server = MockIamportServer().__enter__()
+        server.payments['imp_1'] = {'imp_uid': 'imp_1', 'merchant_uid': 'm_1'}
+        scheduler = RequestScheduler(capacity=2)
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=server.url, transport="async",
+                           scheduler=scheduler)
+        api_instance = Payments(**client._api_kwargs)
+
+        async def fetch():
+            return await asyncio.gather(*[api_instance.arequest('GET', '/imp_1') for _ in range(6)])
+
+        responses = asyncio.run(fetch())
+        self.assertTrue(all(response.data['merchant_uid'] == 'm_1' for response in responses))
+        self.assertEqual(scheduler.in_use(), 0)
+        client.close()
+        server.__exit__()
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def setUp(self):
+        class SlowOnceTransport(BaseTransport):
+            def __init__(self):
+                self.calls = []
+                self.lock = threading.Lock()
+
+            def request(self, method, url, params=None, data=None, headers=None):
+                with self.lock:
+                    self.calls.append(method)
+                    first = len(self.calls) == 1
+                if first:
+                    time.sleep(0.5)
+                return TransportResponse(200, json.dumps({'code': 0, 'message': None,
+                                                          'response': {'slow': first}}).encode('utf-8'))
+
+        self.transport = SlowOnceTransport()
+
+    def test_hedge_get(self):
+        policy = HedgePolicy(max_delay=0.05, budget=1.0)
+        api_instance = Payments(None, transport=self.transport, hedging=policy)
+        started_at = time.monotonic()
+        response = api_instance.get('imp_1')
+        self.assertLess(time.monotonic() - started_at, 0.4)
+        self.assertFalse(response.data['slow'])
+        self.assertEqual(self.transport.calls, ['GET', 'GET'])
+
+    def test_never_hedge_post(self):
+        policy = HedgePolicy(max_delay=0.05, budget=1.0)
+        api_instance = Payments(None, transport=self.transport, hedging=policy)
+        api_instance.post_cancel(imp_uid='imp_1')
+        self.assertEqual(self.transport.calls, ['POST'])
+
+    def test_budget(self):
+        policy = HedgePolicy(max_delay=0.05, budget=0.0)
+        api_instance = Payments(None, transport=self.transport, hedging=policy)
+        self.assertTrue(api_instance.get('imp_1').data['slow'])
+        self.assertEqual(self.transport.calls, ['GET'])
+
+    def test_no_idle_worker(self):
+        policy = HedgePolicy(max_delay=0.05, budget=1.0, max_workers=1)
+        api_instance = Payments(None, transport=self.transport, hedging=policy)
+        self.assertTrue(api_instance.get('imp_1').data['slow'])  # 추가 요청을 보낼 여유 스레드가 없습니다.
+        self.assertEqual(self.transport.calls, ['GET'])
+
+        release = threading.Event()
+        policy._reserve()
+        busy = policy._submit(release.wait)
+        caller = threading.get_ident()
+        self.assertEqual(policy.execute(threading.get_ident), caller)  # 대기하지 않고 호출한 스레드에서 실행합니다.
+        release.set()
+        busy.result()
+        policy.shutdown()
+
+    def test_adaptive_delay(self):
+        policy = HedgePolicy(percentile=50, min_delay=0.001, max_delay=1.0)
+        for _ in range(HedgePolicy.MIN_SAMPLES):
+            policy.execute(lambda: time.sleep(0.005))
+        self.assertLess(policy.delay, 0.5)
+        self.assertGreaterEqual(policy.delay, 0.005)
+
+
+class TestCodeTable(unittest.TestCase):
+    def test_snapshot_lookup(self):
+        server = MockIamportServer().__enter__()
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=server.url)
+        calls = len(server.requests)
+        self.assertEqual(client.bank_codes.name("088"), "신한은행")
+        self.assertEqual(client.bank_codes.code("KB국민은행"), "004")
+        self.assertEqual(client.card_codes.name("365"), "삼성카드")
+        self.assertEqual(len(server.requests), calls)
+
+        client.bank_codes.refresh()
+        self.assertEqual(client.bank_codes.name("999"), "테스트은행")
+        self.assertIsNone(client.bank_codes.name("088"))
+        self.assertEqual(client.bank_codes.resolve("국민은행"), "004")
+        self.assertEqual(client.bank_codes.resolve("KB국민은행"), "004")  # 내장 코드표의 이름은 별칭으로 유지됩니다.
+        self.assertRaises(ValueError, client.bank_codes.resolve, "신한은행")  # 갱신된 목록에 없는 코드의 별칭은 제거됩니다.
+        server.__exit__()
+
+    def test_unknown_refund_bank(self):
+        server = MockIamportServer().__enter__()
+        server.payments['imp_1'] = {'imp_uid': 'imp_1', 'merchant_uid': 'm_1', 'amount': 1000,
+                                    'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=server.url)
+        self.assertRaises(ValueError, client.cancel_payment, imp_uid='imp_1', refund_holder="홍길동",
+                          refund_bank="없는은행", refund_account="1234")
+        self.assertFalse([path for _, path, _ in server.requests if path == "/payments/cancel"])
+        self.assertEqual(client.cancel_payment(imp_uid='imp_1', refund_holder="홍길동", refund_bank="KB국민은행",
+                                               refund_account="1234")['cancel_amount'], 1000)
+        server.payments['imp_2'] = {'imp_uid': 'imp_2', 'merchant_uid': 'm_2', 'amount': 1000,
+                                    'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        client.cancel_payment(imp_uid='imp_2', refund_holder="홍길동", refund_bank="054", refund_account="1234")
+        self.assertEqual([form['refund_bank'] for _, path, form in server.requests if path == "/payments/cancel"],
+                         ["004", "054"])  # 내장 코드표에 없는 은행코드(HSBC)도 그대로 전달합니다.
+        server.__exit__()
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return [{'code': "001", 'name': "새은행"}]
+
+        table = CodeTable(fetch, (("000", "옛은행"),))
+        self.assertEqual(table.resolve("옛은행"), "000")
+        table.start(interval=60)
+        self.assertTrue(refreshed.wait(1))
+        table.stop()
+        time.sleep(0.05)
+        self.assertEqual(table.resolve("새은행"), "001")
+        self.assertRaises(ValueError, table.resolve, "unknown")
+
+    def test_failed_refresh_keeps_index(self):
+        def fetch():
+            raise ValueError()
+
+        table = CodeTable(fetch, (("000", "옛은행"),))
+        table.start(interval=60)
+        time.sleep(0.05)
+        table.stop()
+        self.assertEqual(table.name("000"), "옛은행")
+
+
+class TestPaymentAggregate(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+        base = 1700000000  # 2023-11-15 07:13:20 KST
+        for i in range(30):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i,
+                                                  'amount': 1000, 'cancel_amount': 100 if i % 3 == 0 else 0,
+                                                  'status': consts.IMP_STATUS_PAID, 'pay_method': "card",
+                                                  'pg_provider': "inicis" if i % 2 else "kcp",
+                                                  'started_at': base + i * 3600, 'paid_at': base + i * 3600}
+
+    def tearDown(self):
+        self.server.__exit__()
+
+    def test_split_windows(self):
+        self.assertEqual(split_windows(0, 25, 10), [(0, 9), (10, 19), (20, 25)])
+        self.assertEqual(split_windows(5, 5, 10), [(5, 5)])
+        self.assertRaises(ValueError, split_windows, 0, 25, 0)
+        self.assertRaises(ValueError, self.client.aggregate_payments, search_from=0, search_to=25, window=-1)
+
+    def test_group_and_merge(self):
+        payments = list(self.server.payments.values())
+        whole = PaymentAggregate(('day', 'pg_provider')).update(payments)
+        merged = PaymentAggregate(('day', 'pg_provider')).update(payments[:10]).merge(
+            PaymentAggregate(('day', 'pg_provider')).update(payments[10:]))
+        self.assertEqual(whole.rows(), merged.rows())
+        self.assertEqual(whole.get('2023-11-15', "kcp"), {'count': 9, 'amount': 9000, 'cancel_amount': 300})
+        self.assertEqual(sum(row['count'] for row in whole.rows()), 30)
+        with self.assertRaises(ValueError):
+            whole.merge(PaymentAggregate(('status',)))
+        with self.assertRaises(ValueError):
+            PaymentAggregate(('unknown',))
+
+    def test_aggregate_payments(self):
+        result = self.client.aggregate_payments(1700000000, 1700000000 + 29 * 3600, group_by=('day',),
+                                                window=7200, max_workers=3)
+        self.assertEqual([row['day'] for row in result.rows()], ["2023-11-15", "2023-11-16"])
+        self.assertEqual(sum(row['count'] for row in result.rows()), 30)
+        self.assertEqual(sum(row['cancel_amount'] for row in result.rows()), 1000)
+        self.assertEqual(len([request for request in self.server.requests if "/status/" in request[1]]), 15)
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        for i in range(200):
+            self.server.payments['imp_%d' % i] = {'imp_uid': 'imp_%d' % i, 'merchant_uid': 'm_%d' % i,
+                                                  'amount': 1000, 'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+
+    def tearDown(self):
+        self.server.__exit__()
+
+    def _token_requests(self):
+        return len([path for method, path, _ in self.server.requests if path == "/users/getToken"])
+
+    def test_shared_client_with_token_rotation(self):
+        with Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url) as client:
+            def work(i):
+                if i == 100:
+                    self.server.TOKEN = "rotated_access_token"
+                return client.find_payment(imp_uid='imp_%d' % (i % 200))['merchant_uid']
+
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(work, range(400)))
+
+        self.assertEqual(results, ['m_%d' % (i % 200) for i in range(400)])
+        self.assertEqual(client.imp_auth.token, "rotated_access_token")
+        self.assertEqual(self._token_requests(), 2)
+
+    def test_concurrent_refresh_is_single_flight(self):
+        auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, imp_url=self.server.url)
+        stale = auth.token
+        self.server.TOKEN = "rotated_access_token"
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(lambda _: auth.refresh(stale), range(32)))
+        self.assertEqual(set(tokens), {"rotated_access_token"})
+        self.assertEqual(self._token_requests(), 2)
+
+    def test_per_thread_sessions_share_pool(self):
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            barrier = threading.Barrier(2)
+
+            def session():
+                barrier.wait()
+                return client.transport._session()
+
+            first, second = [future.result() for future in [executor.submit(session) for _ in range(2)]]
+        self.assertIsNot(first, second)
+        self.assertIs(first.adapters['https://'], client.requests_session.adapters['https://'])
+        client.close()
+
+        session = requests.Session()
+        client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url, session=session)
+        self.assertIs(client.transport._session(), session)
+
+    def test_close_keeps_caller_session(self):
+        closed = []
+
+        class TrackedSession(requests.Session):
+            def close(self):
+                closed.append(self)
+                super().close()
+
+        session = TrackedSession()
+        with Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url, session=session):
+            pass
+        self.assertEqual(closed, [])
+
+
+class TestSidecar(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.server.payments['imp_1'] = {'imp_uid': 'imp_1', 'merchant_uid': 'm_1', 'amount': 1000,
+                                         'cancel_amount': 0, 'status': consts.IMP_STATUS_PAID}
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "sidecar.sock")
+        self.sidecar = SidecarServer(self.path, TEST_IMP_KEY, TEST_IMP_SECRET, imp_url=self.server.url, cache_ttl=60)
+        threading.Thread(target=self.sidecar.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.sidecar.shutdown()
+        self.sidecar.server_close()
+        self.tempdir.cleanup()
+        self.server.__exit__()
+
+    def _client(self, **kwargs):
+        return Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url="http://sidecar/",
+                         transport=SidecarTransport(self.path), **kwargs)
+
+    def _upstream(self, path):
+        return len([request for request in self.server.requests if request[1] == path])
+
+    def test_clients_share_upstream(self):
+        clients = [self._client() for _ in range(3)]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda i: clients[i % 3].find_payment(imp_uid='imp_1'), range(30)))
+        self.assertTrue(all(payment['merchant_uid'] == 'm_1' for payment in results))
+        self.assertEqual(self._upstream("/users/getToken"), 1)
+
+        clients[0].find_banks()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda i: clients[i % 3].find_banks(), range(30)))
+        self.assertEqual(self._upstream("/banks"), 1)  # 나머지는 사이드카 캐시에서 응답합니다.
+
+        payment = clients[0].cancel_payment(imp_uid='imp_1', amount=100)
+        self.assertEqual(payment['cancel_amount'], 100)
+        self.assertEqual(clients[1].find_payment(imp_uid='imp_1')['cancel_amount'], 100)
+        for client in clients:
+            client.close()
+
+    def test_json_body(self):
+        client = self._client()
+        logis = {'company': "CJGLS", 'invoice': "1234", 'sent_at': 1700000000}
+        payment = client.register_escrow_logis('imp_1', {'name': "판매자"}, {'name': "구매자"}, logis)
+        self.assertEqual(payment['invoice'], "1234")
+        self.assertEqual(self.server.requests[-1][2]['sender'], {'name': "판매자"})
+
+    def test_protocol_versions(self):
+        client = self._client()
+        token = client.imp_auth.token
+        legacy = json.dumps(["GET", "/payments/imp_1", {}, {}, token]).encode('utf-8')
+        status, body = self.sidecar.dispatch(legacy)
+        self.assertEqual((status, json.loads(body.decode('utf-8'))['response']['merchant_uid']), (200, 'm_1'))
+
+        future = json.dumps([99, "GET", "/payments/imp_1", {}, "", token, None]).encode('utf-8')
+        self.assertEqual(self.sidecar.dispatch(future)[0], 400)
+        self.assertEqual(self.sidecar.dispatch(b'{"method": "GET"}')[0], 400)
+
+    def test_invalid_credentials(self):
+        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key="invalid_key", imp_secret="invalid_secret",
+                          transport=SidecarTransport(self.path))
+        status, _ = self.sidecar.dispatch(json.dumps([1, 'POST', "/users/getToken", None, None, None, None]).encode())
+        self.assertEqual(status, 401)
+        status, _ = self.sidecar.dispatch(json.dumps([1, 'GET', "/payments/imp_1", None, None, 1234, None]).encode())
+        self.assertEqual(status, 401)
+
+    def test_socket_permissions(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o077, 0)
+
+    def test_upstream_token_refresh(self):
+        client = self._client(merchant_index_size=0)
+        self.server.TOKEN = "rotated_access_token"
+        self.assertEqual(client.find_payment(imp_uid='imp_1')['merchant_uid'], 'm_1')
+        self.assertEqual(self._upstream("/users/getToken"), 2)
+        self.assertEqual(self.sidecar.imp_auth.token, "rotated_access_token")
+        self.assertEqual(client.imp_auth.token, self.sidecar._client_token)
+
+    def test_upstream_failure(self):
+        self.server.__exit__()
+        client = self._client()
+        response = client.transport.request('GET', "http://sidecar/payments/imp_2",
+                                            headers={'Authorization': client.imp_auth.token})
+        self.assertEqual(response.status_code, 502)
+        self.server = MockIamportServer().__enter__()
+
+
+class TestEscrowLogis(unittest.TestCase):
+    def setUp(self):
+        self.server = MockIamportServer().__enter__()
+        self.client = Iamporter(imp_key=TEST_IMP_KEY, imp_secret=TEST_IMP_SECRET, imp_url=self.server.url)
+
+    def tearDown(self):
+        self.server.__exit__()
+
+    @staticmethod
+    def _shipment(i, invoice="1234567890"):
+        return {'imp_uid': 'imp_%d' % i, 'sender_name': "판매자", 'sender_tel': "010-0000-0000",
+                'receiver_name': "구매자", 'receiver_tel': "010-1111-1111", 'receiver_addr': "서울",
+                'logis_company': "CJGLS", 'logis_invoice': invoice, 'logis_sent_at': 1700000000}
+
+    def test_register_and_update(self):
+        sender, receiver = {'name': "판매자"}, {'name': "구매자", 'addr': "서울 강남구"}
+        logis = {'company': "CJGLS", 'invoice': "1234", 'sent_at': 1700000000}
+        self.assertEqual(self.client.register_escrow_logis('imp_0', sender, receiver, logis)['invoice'], "1234")
+        updated = self.client.update_escrow_logis('imp_0', sender, receiver, dict(logis, invoice="5678"))
+        self.assertEqual(updated['invoice'], "5678")
+        self.assertEqual(self.server.requests[-1][2]['receiver'], receiver)
+        self.assertRaises(KeyError, self.client.register_escrow_logis, 'imp_0', sender, receiver)
+
+    def test_register_escrows(self):
+        self.server.unavailable['imp_1'] = 1
+        self.server.fail_after_commit.add('imp_2')
+        self.server.unavailable['imp_3'] = 5
+        shipments = [self._shipment(i) for i in range(6)] + [self._shipment(6, invoice=None)]
+
+        results = {result.key: result for result in self.client.register_escrows(shipments, rate=100, backoff=0.01)}
+        self.assertTrue(all(results['imp_%d' % i].is_succeed for i in (0, 1, 2, 4, 5)))
+        self.assertEqual(results['imp_2'].data['invoice'], "1234567890")
+        self.assertEqual(results['imp_3'].error.response.status, 503)
+        self.assertEqual(results['imp_6'].error.response.status, 400)
+        self.assertEqual(len([request for request in self.server.requests if request[1] == "/escrows/logis/imp_6"]),
+                         1)
+        self.assertIn(("PUT", "/escrows/logis/imp_2"), [request[:2] for request in self.server.requests])
+
+        report = BulkReport.collect(results.values())
+        self.assertEqual((report.total, len(report.succeeded), len(report.failed)), (7, 5, 2))
+        self.assertEqual(report.retryable, ['imp_3'])
+        self.assertIn("재시도 가능 1건", str(report))
+
+
 class TestIamporter(unittest.TestCase):
     def setUp(self):
-        self.imp_auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET)
-        self.client = Iamporter(imp_auth=self.imp_auth)
+        self.server = MockIamportServer().__enter__()
+        self.imp_auth = IamportAuth(TEST_IMP_KEY, TEST_IMP_SECRET, imp_url=self.server.url)
+        self.client = Iamporter(imp_auth=self.imp_auth, imp_url=self.server.url)
 
     def test_init(self):
-        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key=None)
-        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key="invalid_key", imp_secret="invalid_secret")
+        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key=None, imp_url=self.server.url)
+        self.assertRaises(errors.ImpUnAuthorized, Iamporter, imp_key="invalid_key", imp_secret="invalid_secret",
+                          imp_url=self.server.url)
 
     def test_find_payment(self):
         self.assertRaises(KeyError, self.client.find_payment)
@@ -170,8 +1385,8 @@ class TestIamporter(unittest.TestCase):
             self.assertEqual(e.response.message, "등록되지 않은 구매자입니다.")
 
     def tearDown(self):
-        del self.imp_auth
-        del self.client
+        self.client.close()
+        self.server.__exit__()
 
 
 if __name__ == "__main__":